@@ -1,7 +1,11 @@
-try:
-    from . import autodefine
-except Exception as ex:
-    raise Exception("\n\nATTENTION! Please create screenshot this error massage and open an issue on \n"
-                    "https://github.com/artyompetrov/AutoDefine_oxfordlearnersdictionaries/issues \n"
-                    "(you can find the clickable link on the add-on page) \n"
-                    "so I could investigate the reason of error and fix it") from ex
\ No newline at end of file
+import sys
+
+# the editor and browser integration is loaded only by Anki, the lookup pipeline can be imported without it
+if 'aqt' in sys.modules:
+    try:
+        from . import autodefine
+    except Exception as ex:
+        raise Exception("\n\nATTENTION! Please create screenshot this error massage and open an issue on \n"
+                        "https://github.com/artyompetrov/AutoDefine_oxfordlearnersdictionaries/issues \n"
+                        "(you can find the clickable link on the add-on page) \n"
+                        "so I could investigate the reason of error and fix it") from ex
\ No newline at end of file
@@ -9,40 +9,41 @@
 #
 # Then was completely overwritten
 
+import hashlib
+import html
+import json
 import os
 import re
 from anki.hooks import addHook
 from aqt import mw, gui_hooks
 from aqt.utils import tooltip
-from aqt.utils import askUser, askUserDialog
-from bs4 import BeautifulSoup
-import requests
+from aqt.utils import askUser, askUserDialog, showText
 import webbrowser
-import importlib.util
-import sys
-from contextlib import contextmanager
 import pathlib
-from .oxford import Word, WordNotFound
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .pipeline import (get_config_value, get_words_info, get_word_name, get_verb_forms, get_definition_html,
+                       get_phonetics, get_audio, get_audio_dict, get_audio_files, clean_html, audio_downloader,
+                       page_lookups, config_fingerprint, reports, report_listeners, BULK_WORKERS)
+from .cache import USER_FILES_DIR, Prefetcher
+from .oxford import RateLimited, Session
+from .journal import BulkJournal
+from .timing import recorder
 from http import cookiejar
 from aqt.addcards import AddCards
 from aqt.editor import Editor
 from aqt.qt import *
 from typing import Optional
 
-add_dialog: Optional[AddCards] = None
-
-if getattr(mw.addonManager, "getConfig", None):
-    CONFIG = mw.addonManager.getConfig(__name__)
+try:
+    from aqt.operations.note import update_note as update_note_op
+except ImportError:
+    # Anki before 2.1.45
+    update_note_op = None
 
+add_dialog: Optional[AddCards] = None
 
-def get_config_value(section_name, param_name, default):
-    value = default
-    if CONFIG is not None:
-        if section_name in CONFIG:
-            section = CONFIG[section_name]
-            if param_name in section:
-                value = section[param_name]
-    return value
+bulk_journal = BulkJournal(os.path.join(USER_FILES_DIR, 'bulk_journal.jsonl'))
 
 DEFAULT_TEMPLATE_NAME = "AutoDefineOxfordLearnersDictionary"
 
@@ -50,8 +51,6 @@ ERROR_TAG_NAME = "AutoDefine_Error"
 
 WORD_NOT_REPLACED_TAG_NAME = "AutoDefine_WordNotReplaced"
 
-AUDIO_FORMAT = "mp3"
-
 SUPPORT_MESSAGE_TEXT = (
     "Enjoy AutoDefine? Please like and support the project "
     "(search \"AutoDefine Oxford\" on Google to find the add-on)."
@@ -66,16 +65,13 @@ USE_DEFAULT_TEMPLATE = get_config_value(section, " 1. USE_DEFAULT_TEMPLATE", Tru
 section = '1. word'
 SOURCE_FIELD = get_config_value(section, " 1. SOURCE_FIELD", 0)
 CLEAN_HTML_IN_SOURCE_FIELD = get_config_value(section, " 2. CLEAN_HTML_IN_SOURCE_FIELD", True)
+PREFETCH = get_config_value(section, " 3. PREFETCH", False)
 
 section = '2. definition'
 DEFINITION = get_config_value(section, " 1. DEFINITION", True)
 DEFINITION_FIELD = get_config_value(section, " 2. DEFINITION_FIELD", 1)
-REPLACE_BY = get_config_value(section, " 3. REPLACE_BY", "#$#")
-MAX_EXAMPLES_COUNT_PER_DEFINITION = get_config_value(section, " 4. MAX_EXAMPLES_COUNT_PER_DEFINITION", 2)
-MAX_DEFINITIONS_COUNT_PER_PART_OF_SPEECH = get_config_value(section, " 5. MAX_DEFINITIONS_COUNT_PER_PART_OF_SPEECH", 3)
 
 section = '3. audio and phonetics'
-CORPUS = get_config_value(section, " 1. CORPUS", "American")
 AUDIO = get_config_value(section, " 2. AUDIO", True)
 AUDIO_FIELD = get_config_value(section, " 3. AUDIO_FIELD", 2)
 PHONETICS = get_config_value(section, " 4. PHONETICS", True)
@@ -99,58 +95,32 @@ if not isinstance(primary_shortcut_value, str):
     primary_shortcut_value = ""
 PRIMARY_SHORTCUT = primary_shortcut_value.strip() or DEFAULT_SHORTCUT
 
-if CORPUS.lower() == 'british':
-    CORPUS_TAGS_PRIORITIZED = ['BrE']
-elif CORPUS.lower() == 'american':
-    CORPUS_TAGS_PRIORITIZED = ['nAmE']
-elif CORPUS.lower() == 'british_first':
-    CORPUS_TAGS_PRIORITIZED = ['BrE', 'nAmE']
-elif CORPUS.lower() == 'american_first':
-    CORPUS_TAGS_PRIORITIZED = ['nAmE', 'BrE']
-else:
-    raise Exception("Unknown CORPUS " + CORPUS)
+section = '7. bulk'
+BULK_WRITE_CHUNK_SIZE = max(1, int(get_config_value(section, " 2. WRITE_CHUNK_SIZE", 100)))
 
+# a prefetched lookup older than this is looked up again
+PREFETCH_TTL_SECONDS = 60
 
-class BlockAll(cookiejar.CookiePolicy):
-    """ policy to block cookies """
-    return_ok = set_ok = domain_return_ok = path_return_ok = lambda self, *args, **kwargs: False
-    netscape = True
-    rfc2965 = hide_cookie2 = False
+# defines in the editor block Anki, they give up rather than wait this long for a rate limited site,
+# bulk runs wait as long as the site asks
+INTERACTIVE_MAX_WAIT_SECONDS = 3
+RATE_LIMITED_MESSAGE = "The dictionary is refusing requests right now, please try again later"
 
 
-@contextmanager
-def add_to_path(p):
-    import sys
-    old_path = sys.path
-    sys.path = sys.path[:]
-    sys.path.insert(0, str(p))
-    try:
-        yield
-    finally:
-        sys.path = old_path
-
+def get_words_info_interactive(word):
+    """ get_words_info() for the editor, see INTERACTIVE_MAX_WAIT_SECONDS """
+    with Session.waiting_at_most(INTERACTIVE_MAX_WAIT_SECONDS):
+        return get_words_info(word)
 
-def path_import(name):
-    absolute_path = os.path.join(pathlib.Path(__file__).parent, 'modules')
-    init_file = os.path.join(absolute_path, name, '__init__.py')
-    with add_to_path(absolute_path):
-        spec = importlib.util.spec_from_file_location(name, init_file)
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[name] = module
-        spec.loader.exec_module(module)
-        return module
 
+prefetcher = Prefetcher(get_words_info_interactive, PREFETCH_TTL_SECONDS)
 
-nltk = path_import('nltk')
-ps = nltk.stem.PorterStemmer()
 
-tokinize = nltk.wordpunct_tokenize
-unify = ps.stem
-
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
-                  'Chrome/118.0.0.0 Safari/537.36'
-}
+class BlockAll(cookiejar.CookiePolicy):
+    """ policy to block cookies """
+    return_ok = set_ok = domain_return_ok = path_return_ok = lambda self, *args, **kwargs: False
+    netscape = True
+    rfc2965 = hide_cookie2 = False
 
 
 def focus_zero_field(editor):
@@ -169,72 +139,8 @@ def get_word(note):
     return word
 
 
-def nltk_token_spans(txt):
-    tokens = tokinize(txt)
-    offset = 0
-    for token in tokens:
-        offset = txt.find(token, offset)
-        next_offset = offset + len(token)
-        yield token, offset, next_offset
-        assert token == txt[offset:next_offset]
-        offset = next_offset
-
-
-def replace_word_in_sentence(words_to_replace_lists, sentence, highlight):
-    replaced_anything = False
-
-    result = str()
-    for words_to_replace in words_to_replace_lists:
-        result = str()
-
-        spans = list(nltk_token_spans(sentence))
-
-        position = 0
-        offset = 0
-        while position < len(spans):
-            all_match = True
-            cur_position = position
-            for word_to_replace in words_to_replace:
-                token, start, stop = spans[cur_position]
-                if all_match:
-                    if unify(str.lower(token)) != word_to_replace:
-                        all_match = False
-                        break
-                    else:
-                        cur_position += 1
-                        if cur_position >= len(spans):
-                            break
-            if all_match:
-                for i in range(len(words_to_replace)):
-                    token, start, stop = spans[position + i]
-                    replacement = REPLACE_BY.replace("$", token)
-                    spaces_to_add = start - len(result) - offset
-                    offset += len(token) - len(replacement)
-                    if spaces_to_add < 0:
-                        raise Exception("Incorrect spaces_to_add value")
-                    result += ' ' * spaces_to_add
-                    result += replacement
-
-                position += len(words_to_replace)
-                replaced_anything = True
-            else:
-                token, start, stop = spans[position]
-                spaces_to_add = start - len(result) - offset
-                if spaces_to_add < 0:
-                    raise Exception("Incorrect spaces_to_add value")
-                result += ' ' * spaces_to_add
-                result += token
-                position += 1
-        sentence = result
-
-    if not replaced_anything and highlight:
-        result = '<font color="red">Word_not_replaced</font> ' + result
-
-    return replaced_anything, result
-
-
-
-def get_data(note, is_bulk):
+@recorder.timed('define')
+def get_data(note, is_bulk, words_info_future=None):
     try:
         word = get_word(note)
         if word == "":
@@ -243,7 +149,13 @@ def get_data(note, is_bulk):
         if CLEAN_HTML_IN_SOURCE_FIELD:
             insert_into_field(note, word, SOURCE_FIELD, overwrite=True)
 
-        words_info = get_words_info(word)
+        try:
+            if words_info_future is not None:
+                words_info = words_info_future.result()
+            else:
+                words_info = get_words_info(word)
+        except RateLimited:
+            raise AutoDefineError(RATE_LIMITED_MESSAGE)
 
         if len(words_info) == 0:
             raise AutoDefineError(f"Word not found in dictionary")
@@ -276,7 +188,10 @@ def get_data(note, is_bulk):
             insert_into_field(note, phonetics, PHONETICS_FIELD, overwrite=True)
 
         if AUDIO:
-            audio = get_audio(words_info)
+            try:
+                audio = get_audio(words_info, get_media_path())
+            except RateLimited:
+                raise AutoDefineError(RATE_LIMITED_MESSAGE)
             insert_into_field(note, audio, AUDIO_FIELD, overwrite=True)
 
         if VERB_FORMS:
@@ -297,196 +212,9 @@ def get_data(note, is_bulk):
         raise error
 
 
-def get_verb_forms(words_info):
-    forms = []
-    for word_info in words_info:
-        verb_forms = word_info.get("verb_forms")
-        if verb_forms is not None:
-            thirdps = verb_forms.get("thirdps")
-            if thirdps is not None:
-                forms.append(thirdps.get('value'))
-
-            past = verb_forms.get("past")
-            if past is not None:
-                forms.append(past.get('value'))
-
-            pastpart = verb_forms.get("pastpart")
-            if pastpart is not None:
-                forms.append(pastpart.get('value'))
-
-            prespart = verb_forms.get("prespart")
-            if prespart is not None:
-                forms.append(prespart.get('value'))
-    return forms
-
-
-def get_words_info(request_word):
-    words_info = []
-    word_to_search = request_word.replace(" ", "-").lower()
-    try:
-        Word.get(word_to_search, HEADERS, is_search=True)
-
-        word_info = Word.info()
-        words_info.append(word_info)
-        word_name = word_info['name'].lower()
-        other_results = word_info.get('other_results')
-        if other_results is not None:
-            for other_result in other_results:
-                all_matches = other_result.get('All matches')
-                if all_matches is not None:
-                    for match in all_matches:
-                        if word_name == match['name'].strip().lower():
-                            try:
-                                Word.get(match['id'], HEADERS, is_search=False)
-                                word_info = Word.info()
-                                if word_info['name'].lower() == word_name:
-                                    words_info.append(Word.info())
-                            except WordNotFound:
-                                pass
-
-    except WordNotFound:
-        pass
-    return words_info
-
-
-def get_word_name(word_infos):
-    for word_info in word_infos:
-        return word_info["name"]
-
-
-def get_definition_html(word_infos, verb_forms):
-    strings = []
-
-    need_word_not_replaced_tag = False
-    for word_info in word_infos:
-        definitions_by_namespaces = word_info["definitions"]
-
-        definitions = []
-        for definition_by_namespace in definitions_by_namespaces:
-            for definition in definition_by_namespace["definitions"]:
-                definitions.append(definition)
-
-        if len(definitions) == 0:
-            continue
-
-        word = word_info["name"]
-        wordform = word_info.get("wordform")
-        if wordform is not None:
-            strings.append('<i>' + wordform + '</i>')
-
-        if MAX_DEFINITIONS_COUNT_PER_PART_OF_SPEECH is not False:
-            definitions = definitions[0:MAX_DEFINITIONS_COUNT_PER_PART_OF_SPEECH]
-
-        words_to_replace = [word]
-        for verb_form in verb_forms:
-            words_to_replace.append(verb_form)
-        words_to_replace_lists = set([tuple([unify(str.lower(word)) for word in tokinize(words)]) for words in words_to_replace])
-
-        previous_definition_without_examples = False
-        for definition in definitions:
-            maybe_description = definition.get("description")
-            if maybe_description is not None:
-                (_, description) = replace_word_in_sentence(words_to_replace_lists, maybe_description, False)
-                if previous_definition_without_examples:
-                    strings.append('<br/>')
-                strings.append('<div><b>' + description + '</b></div>')
-
-            examples = definition.get("examples", []) + definition.get("extra_example", [])
-
-            if MAX_EXAMPLES_COUNT_PER_DEFINITION is not False:
-                examples = examples[0:MAX_EXAMPLES_COUNT_PER_DEFINITION]
-
-            if len(examples) > 0:
-                strings.append('<ul>')
-                for example in examples:
-                    example = example.replace('/', ' / ')
-                    (replaced_anything, example_clean) = replace_word_in_sentence(words_to_replace_lists, example, True)
-
-                    need_word_not_replaced_tag |= not replaced_anything
-                    strings.append('<li>' + example_clean + '</li>')
-                strings.append('</ul>')
-                previous_definition_without_examples = False
-            else:
-                previous_definition_without_examples = True
-
-        strings.append('<hr/>')
-
-    if len(strings) > 0:
-        del strings[-1]
-
-    return BeautifulSoup(''.join(strings), 'html.parser').prettify(), need_word_not_replaced_tag
-
-
-def get_phonetics(word_infos):
-    phonetics_dict = {}
-    for word_info in word_infos:
-        wordform = word_info.get("wordform")
-        if wordform is None:
-            wordform = "none"
-        pronunciations = word_info.get("pronunciations")
-        fill_phonetics_dict_prioritized(phonetics_dict, pronunciations, wordform)
-
-    if len(phonetics_dict) == 0:
-        return "<span class=\"do_not_show\">No phonetics found</span>"
-    elif len(phonetics_dict) == 1:
-        return '[' + next(iter(phonetics_dict)) + ']'
-    else:
-        return "<br/>".join(["[" + key + '] - ' + ", ".join(phonetics_dict[key]) for key in iter(phonetics_dict)])
-
-
-def fill_phonetics_dict_prioritized(phonetics_dict, pronunciations, wordform):
-    for corpus_tag in CORPUS_TAGS_PRIORITIZED:
-        for pronunciation in pronunciations:
-            if corpus_tag == pronunciation["prefix"]:
-                phonetics = pronunciation["ipa"].replace('/', "")
-
-                value = phonetics_dict.get(phonetics, None)
-                if value is not None:
-                    value.append(wordform)
-                else:
-                    phonetics_dict[phonetics] = [wordform]
-
-
-def get_audio(word_infos):
-    audio_dict = {}
-    for word_info in word_infos:
-        wordform = word_info.get("wordform")
-        if wordform is None:
-            wordform = "none"
-        pronunciations = word_info.get("pronunciations")
-        fill_audio_dict_prioritized(audio_dict, pronunciations, wordform)
-
-    if len(audio_dict) == 0:
-        return "<span class=\"do_not_show\">No audio found</span>"
-    elif len(audio_dict) == 1:
-        return f'[sound:{audio_dict[next(iter(audio_dict))]["audio_name"]}]'
-    else:
-        return "<br/>".join(["[sound:" + audio_dict[key]['audio_name'] + '] - ' +
-                             ", ".join(audio_dict[key]['wordform']) for key in iter(audio_dict)])
-
-
-def fill_audio_dict_prioritized(audio_dict, pronunciations, wordform):
-    for corpus_tag in CORPUS_TAGS_PRIORITIZED:
-        for pronunciation in pronunciations:
-            if corpus_tag == pronunciation["prefix"]:
-                audio_url = pronunciation["mp3"] if AUDIO_FORMAT.lower() == "mp3" else pronunciation["ogg"]
-
-                audio_name = audio_url.split('/')[-1]
-
-                collection_path = pathlib.Path(mw.col.path).parent.absolute()
-                media_path = os.path.join(collection_path, "collection.media")
-                audio_path = os.path.join(media_path, audio_name)
-
-                value = audio_dict.get(audio_name, None)
-                if value is not None:
-                    value['wordform'].append(wordform)
-                else:
-                    if not os.path.exists(audio_path):
-                        response = Word.fetch_audio(audio_url, HEADERS, timeout=5)
-                        with open(audio_path, 'wb') as f:
-                            f.write(response)
-                    audio_dict[audio_name] = {'wordform': [wordform], "audio_name": audio_name}
-                return
+def get_media_path():
+    collection_path = pathlib.Path(mw.col.path).parent.absolute()
+    return os.path.join(collection_path, "collection.media")
 
 
 def insert_into_field(note, text, field_id, overwrite=False):
@@ -502,10 +230,6 @@ def insert_into_field(note, text, field_id, overwrite=False):
         note.fields[field_id] += text
 
 
-def clean_html(raw_html):
-    return re.sub(re.compile('<.*?>'), '', raw_html).replace("&nbsp;", " ")
-
-
 def new_add_cards(addcards: AddCards):
     global add_dialog
     add_dialog = addcards
@@ -523,17 +247,12 @@ def switch_model(name):
         # triggered when not in Add Cards window
         pass
 
-def addCustomModel(col, name):
-    mm = col.models
-    model = mm.byName(name)
 
-    new_model = False
-    if not model:
-        model = mm.new(name)
-        new_model = True
+MODEL_FINGERPRINT_KEY = "AutoDefine_model_fingerprint"
 
-    # add fields
-    model['flds'] = [
+
+def get_model_fields():
+    return [
         {
             'name': 'Word',
             'ord': SOURCE_FIELD,
@@ -608,7 +327,8 @@ def addCustomModel(col, name):
         }
     ]
 
-    model['css'] = """
+
+MODEL_CSS = """
 .card {
   font-family: arial;
   font-size: 20px;
@@ -655,10 +375,9 @@ i {
 }
 """
 
-    # front
-    t = getTemplate(mm, model, 'Normal')
-    t['qfmt'] = """<div class="front">{{Word}} {{Audio}} <br/> {{Phonetics}} <br/> {{VerbForms}}</div>"""
-    t['afmt'] = """
+NORMAL_QFMT = """<div class="front">{{Word}} {{Audio}} <br/> {{Phonetics}} <br/> {{VerbForms}}</div>"""
+
+NORMAL_AFMT = """
 <div class="front">{{Word}} {{Audio}} <br/> {{Phonetics}} <br/> {{VerbForms}}</div>
 <hr id="answer">
 <div class="img" id="img_div">{{Image}}</div>
@@ -677,9 +396,7 @@ i {
 </script>
 """
 
-    # back
-    t = getTemplate(mm, model, "Reverse")
-    t['qfmt'] = """
+REVERSE_QFMT = """
 <script>
     var hintString = '{{Word}}';
     var position = 0;
@@ -728,7 +445,8 @@ i {
     }
 </script>
 """
-    t['afmt'] = """
+
+REVERSE_AFMT = """
 <div class="front">{{Audio}}</div>
     {{FrontSide}}
 <script>
@@ -740,10 +458,63 @@ i {
 </script>
 """
 
+MODEL_TEMPLATES = [
+    ('Normal', NORMAL_QFMT, NORMAL_AFMT),
+    ('Reverse', REVERSE_QFMT, REVERSE_AFMT),
+]
+
+
+def get_model_fingerprint():
+    """ hash of the generated note type, it changes with the add-on version and the configured field numbers """
+    model = [get_model_fields(), MODEL_CSS, MODEL_TEMPLATES]
+    return hashlib.sha1(json.dumps(model).encode('utf-8')).hexdigest()
+
+
+def addCustomModel(col, name):
+    """ create or update the note type, return False when it already matches the generated one
+
+    The fingerprint of the last written note type is kept in the collection config, so the schema
+    is not rewritten on every define.
+    """
+    mm = col.models
+    model = mm.byName(name)
+    fingerprint = get_model_fingerprint()
+    if model and get_collection_config(col, MODEL_FINGERPRINT_KEY) == {"id": model["id"], "fingerprint": fingerprint}:
+        return False
+
+    new_model = False
+    if not model:
+        model = mm.new(name)
+        new_model = True
+
+    # add fields
+    model['flds'] = get_model_fields()
+
+    model['css'] = MODEL_CSS
+
+    for template_name, qfmt, afmt in MODEL_TEMPLATES:
+        t = getTemplate(mm, model, template_name)
+        t['qfmt'] = qfmt
+        t['afmt'] = afmt
+
     if new_model:
         mm.add(model)
     else:
         mm.update(model)
+    set_collection_config(col, MODEL_FINGERPRINT_KEY, {"id": model["id"], "fingerprint": fingerprint})
+    return True
+
+
+def get_collection_config(col, key):
+    # get_config and set_config are missing in old Anki versions, the note type is updated every time there
+    if hasattr(col, "get_config"):
+        return col.get_config(key, None)
+    return None
+
+
+def set_collection_config(col, key, value):
+    if hasattr(col, "set_config"):
+        col.set_config(key, value)
 
 
 def getTemplate(mm, model, templateName):
@@ -754,42 +525,129 @@ def getTemplate(mm, model, templateName):
     mm.addTemplate(model, t)
     return t
 
+
+@recorder.timed('lookup')
+def lookup_note(note):
+    """ network part of get_data: fetch and parse dictionary pages and start audio downloads """
+    word = get_word(note)
+    if word == "":
+        return []
+
+    words_info = get_words_info(word)
+    if AUDIO:
+        # get_audio waits for these downloads when the note is written
+        audio_downloader.prefetch(get_media_path(), get_audio_files(get_audio_dict(words_info)))
+    return words_info
+
+
+def lookup_notes_ahead(executor, nids, window):
+    """ yield (note, future) in nids order while keeping up to `window` lookups running """
+    pending = deque()
+    for nid in nids:
+        note = mw.col.getNote(nid)
+        pending.append((note, executor.submit(lookup_note, note)))
+        if len(pending) >= window:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
+@recorder.timed('write notes')
+def write_notes(notes):
+    """ save notes in one transaction, without an undo entry just like note.flush() """
+    if not notes:
+        return
+    if getattr(mw.col, "update_notes", None):
+        mw.col.update_notes(notes, skip_undo_entry=True)
+    else:
+        for note in notes:
+            note.flush()
+
+
 def bulkDefine(browser):
     ids = browser.selectedNotes()
     if not ids:
         tooltip("No cards selected.")
         return
+
+    fingerprint = config_fingerprint()
+    completed = bulk_journal.completed(fingerprint)
+    resume = False
+    if any(nid in completed for nid in ids):
+        skipped = sum(1 for nid in ids if nid in completed)
+        resume = askUser(f"A previous bulk run was interrupted. Skip {skipped} of the {len(ids)} selected notes "
+                         f"it has already defined?")
+        if resume:
+            ids = [nid for nid in ids if nid not in completed]
+            if not ids:
+                bulk_journal.finish()
+                tooltip("All selected notes were already defined.")
+                return
+
+    bulk_journal.start(len(ids), fingerprint, resume)
     mw.checkpoint("AutoDefine")
+    audio_downloader.reset_index()
+    # the timing report covers this run only
+    recorder.reset()
     mw.progress.start(immediate=True, max=len(ids))
     browser.model.beginReset()
 
     errors = []
+    saved_requests = 0
 
     def process(nids, mw):
+        nonlocal saved_requests
+        # lookups run in the worker pool, notes are written and progress is reported from this thread only
         count = 0
         max = len(nids)
-        for nid in nids:
-            count += 1
-            note = mw.col.getNote(nid)
-            word = None
-            try:
-                word = get_word(note)
-                mw.taskman.run_on_main(
-                    lambda c=count, w=word, m=max: mw.progress.update(value=c, label=w, process=False, max=m)
-                )
-                get_data(note, is_bulk=True)
-
-            except AutoDefineError as error:
-                save_error(count, error.message, word, errors)
-            except Exception as ex:
-                save_error(count, "Exception", word, errors)
-            note.flush()
+        # pages shared by several notes are fetched and parsed once per run
+        saved_before = page_lookups.saved
+        # (note, error text) of the notes not written yet, they are journaled once written
+        unwritten = []
+
+        def write_unwritten():
+            write_notes([note for note, _ in unwritten])
+            for note, error_text in unwritten:
+                bulk_journal.record(note.id, "done" if error_text is None else "error", error_text, fingerprint)
+            unwritten.clear()
+
+        with page_lookups.batch(), ThreadPoolExecutor(max_workers=BULK_WORKERS) as executor:
+            for note, words_info_future in lookup_notes_ahead(executor, nids, BULK_WORKERS * 2):
+                count += 1
+                word = None
+                error_text = None
+                try:
+                    word = get_word(note)
+                    mw.taskman.run_on_main(
+                        lambda c=count, w=word, m=max: mw.progress.update(value=c, label=w, process=False, max=m)
+                    )
+                    get_data(note, is_bulk=True, words_info_future=words_info_future)
+
+                except AutoDefineError as error:
+                    error_text = error.message
+                    save_error(count, error.message, word, errors)
+                except Exception as ex:
+                    error_text = "Exception"
+                    save_error(count, "Exception", word, errors)
+                unwritten.append((note, error_text))
+                if len(unwritten) >= BULK_WRITE_CHUNK_SIZE:
+                    write_unwritten()
+            write_unwritten()
+        saved_requests = page_lookups.saved - saved_before
+        # only a run that got through all notes forgets its journal, otherwise it can be resumed
+        bulk_journal.finish()
 
     def onFinish(future):
+        bulk_journal.close()
         browser.model.endReset()
         mw.requireReset()
         mw.progress.finish()
         mw.reset()
+        if saved_requests > 0:
+            tooltip(f"AutoDefine: {saved_requests} duplicate dictionary requests were skipped", period=5000)
+        if recorder.enabled:
+            recorder.count('duplicates skipped', saved_requests)
+            show_timing_report(browser)
         if len(errors) > 0:
             # QLabel inside AskUserDialog expects HTML; use <br/> to ensure each error shows on its own line.
             error_message = "<br/><br/>".join(errors)
@@ -798,6 +656,20 @@ def bulkDefine(browser):
 
     mw.taskman.run_in_background(process, onFinish, args={"nids": ids, "mw": mw})
 
+
+def show_timing_report(parent):
+    """ show the stage timings of the last bulk run and save them into user_files """
+    os.makedirs(USER_FILES_DIR, exist_ok=True)
+    summary_path = os.path.join(USER_FILES_DIR, 'timing.json')
+    trace_path = os.path.join(USER_FILES_DIR, 'timing_trace.json')
+    recorder.dump_json(summary_path)
+    recorder.dump_chrome_trace(trace_path)
+    text = (f"{recorder.report()}\n\n"
+            f"Saved to {summary_path}\n"
+            f"Trace for chrome://tracing or ui.perfetto.dev saved to {trace_path}")
+    showText("<pre>" + html.escape(text) + "</pre>", type="html", parent=parent, title="AutoDefine timing")
+
+
 def save_error(count, error_text, word, errors):
     if word is not None and word != "":
         errors.append(f"{word}: {error_text}")
@@ -806,19 +678,23 @@ def save_error(count, error_text, word, errors):
 
 def get_data_with_exception_handling(editor: Editor):
     try:
+        model_changed = False
         if USE_DEFAULT_TEMPLATE:
-            addCustomModel(mw.col, DEFAULT_TEMPLATE_NAME)
+            model_changed = addCustomModel(mw.col, DEFAULT_TEMPLATE_NAME)
             switch_model(DEFAULT_TEMPLATE_NAME)
 
         note = editor.note
         try:
-            get_data(note, is_bulk=False)
+            with Session.waiting_at_most(INTERACTIVE_MAX_WAIT_SECONDS):
+                get_data(note, is_bulk=False, words_info_future=take_prefetched(note))
         except AutoDefineError as error:
             tooltip(error.message, period=10000)
 
-        flush_note(note)
-        mw.requireReset()
-        mw.reset()
+        if model_changed or not save_note(note, editor):
+            # a changed note type has to reach every window, old Anki versions need the reset anyway
+            flush_note(note)
+            mw.requireReset()
+            mw.reset()
         editor.loadNote()
         focus_zero_field(editor)
     except Exception as ex:
@@ -827,6 +703,30 @@ def get_data_with_exception_handling(editor: Editor):
                         "so I could investigate the reason of error and fix it") from ex
 
 
+def prefetch_note(note):
+    """ look up the word of a note in the Add Cards window in the background, before it is defined """
+    if note.id or SOURCE_FIELD >= len(note.fields):
+        return
+    word = get_word(note)
+    if word == "":
+        prefetcher.discard()
+    else:
+        # a lookup of the previous word is cancelled or its result dropped
+        prefetcher.prefetch(word)
+
+
+def take_prefetched(note):
+    if not PREFETCH or SOURCE_FIELD >= len(note.fields):
+        return None
+    return prefetcher.take(get_word(note))
+
+
+def on_field_unfocused(changed, note, field_index):
+    if field_index == SOURCE_FIELD:
+        prefetch_note(note)
+    return changed
+
+
 def flush_note(note):
     try:
         note.flush()
@@ -834,11 +734,44 @@ def flush_note(note):
         pass
 
 
+@recorder.timed('save note')
+def save_note(note, editor):
+    """ write the note and refresh only what shows it, return False when this Anki version can't
+
+    The note is written by Anki's own update_note operation, so the define can be undone and the
+    other windows are told what changed, the browser redraws its rows instead of the whole main
+    window being reset. Notes of the Add window are not in the collection yet, there is nothing to write.
+    """
+    if update_note_op is None:
+        return False
+    if note.id:
+        # the editor is the initiator so it doesn't reload the note a second time, failures are
+        # ignored like in flush_note(), e.g. the note was deleted in the meantime
+        update_note_op(parent=editor.widget, note=note).failure(
+            lambda error: None).run_in_background(initiator=editor)
+    return True
+
+
 def run_autodefine(editor: Editor):
     get_data_with_exception_handling(editor)
     show_support_prompt()
 
 
+def show_reports():
+    """ what the add-on could not set up, e.g. an unreadable pack, is shown once Anki is open """
+    # reports made meanwhile by other threads are kept for the next call
+    messages = reports[:]
+    if messages:
+        del reports[:len(messages)]
+        tooltip("AutoDefine: " + "<br>".join(messages), period=10000)
+
+
+def on_report():
+    # reports made before a profile is open are shown by profile_did_open
+    if mw.col is not None:
+        mw.taskman.run_on_main(show_reports)
+
+
 def show_support_prompt():
     tooltip(SUPPORT_MESSAGE_TEXT, period=5000)
 
@@ -877,6 +810,13 @@ addHook("browser.setupMenus", setupMenu)
 
 addHook("setupEditorButtons", setup_buttons)
 gui_hooks.add_cards_did_init.append(new_add_cards)
+gui_hooks.media_check_did_finish.append(lambda output: audio_downloader.reset_index())
+gui_hooks.profile_did_open.append(show_reports)
+report_listeners.append(on_report)
+if PREFETCH:
+    gui_hooks.editor_did_unfocus_field.append(on_field_unfocused)
+    # fires when the user stops typing for a moment
+    gui_hooks.editor_did_fire_typing_timer.append(prefetch_note)
 
 
 class AutoDefineError(Exception):
@@ -366,7 +366,17 @@ class BeautifulSoup(Tag):
         d = dict(self.__dict__)
         if 'builder' in d and d['builder'] is not None and not self.builder.picklable:
             d['builder'] = None
-        return d
+        # The tree itself is in the __slots__ of Tag, pickle restores
+        # the second item of the state with setattr().
+        slots = {}
+        for attr in Tag.__slots__:
+            if attr == '__dict__':
+                continue
+            try:
+                slots[attr] = object.__getattribute__(self, attr)
+            except AttributeError:
+                pass
+        return d, slots
     
     @classmethod
     def _decode_markup(cls, markup):
@@ -459,6 +469,9 @@ class BeautifulSoup(Tag):
         markup.
         """
         Tag.__init__(self, self, self.builder, self.ROOT_TAG_NAME)
+        # Tree builders register namespaces here, so this can't be
+        # the empty dictionary shared by Tags.
+        self._namespaces = dict()
         self.hidden = 1
         self.builder.reset()
         self.current_data = []
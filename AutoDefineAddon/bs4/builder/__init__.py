@@ -318,7 +318,9 @@ class TreeBuilder(object):
                     # values. Split it into a list.
                     value = attrs[attr]
                     if isinstance(value, str):
-                        values = nonwhitespace_re.findall(value)
+                        # Class names repeat all over a document, so
+                        # they share one string object per name.
+                        values = list(map(sys.intern, nonwhitespace_re.findall(value)))
                     else:
                         # html5lib sometimes calls setAttributes twice
                         # for the same tag when rearranging the parse
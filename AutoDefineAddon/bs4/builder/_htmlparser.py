@@ -41,7 +41,7 @@ from bs4.element import (
     Doctype,
     ProcessingInstruction,
     )
-from bs4.dammit import EntitySubstitution, UnicodeDammit
+from bs4.dammit import EncodingDetector, EntitySubstitution, UnicodeDammit
 
 from bs4.builder import (
     DetectsXMLParsedAsHTML,
@@ -131,6 +131,9 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         # XXX namespace
         attr_dict = {}
         for key, value in attrs:
+            # Attribute names repeat on every tag, so they share one
+            # string object per name.
+            key = sys.intern(key)
             # Change None attribute values to the empty string
             # for consistency with the other tree builders.
             if value is None:
@@ -365,6 +368,18 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
             yield (markup, None, None, False)
             return
 
+        if (user_specified_encoding is not None
+            and user_specified_encoding.lower() not in
+                [x.lower() for x in exclude_encodings or []]):
+            # The encoding is known, e.g. from the Content-Type of an
+            # HTTP response: decode once, without looking for an
+            # encoding declared inside the document. If that fails,
+            # UnicodeDammit gets to try everything below.
+            decoded = self._decode_known_encoding(
+                markup, user_specified_encoding)
+            if decoded is not None:
+                yield decoded
+
         # Ask UnicodeDammit to sniff the most likely encoding.
 
         # This was provided by the end-user; treat it as a known
@@ -388,6 +403,28 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
                dammit.declared_html_encoding,
                dammit.contains_replacement_characters)
 
+    @classmethod
+    def _decode_known_encoding(cls, markup, encoding):
+        """Decode markup from an encoding known ahead of time.
+
+        A byte-order mark is skipped the way UnicodeDammit strips it,
+        through a memoryview so the markup isn't copied first.
+
+        :return: A 4-tuple like the ones yielded by prepare_markup(),
+           or None if markup can't be decoded with `encoding`.
+        """
+        encoding = UnicodeDammit.CHARSET_ALIASES.get(
+            encoding, encoding).lower()
+        # strip_byte_order_mark() only looks at the first four bytes.
+        prefix = markup[:4]
+        bom_length = len(prefix) - len(
+            EncodingDetector.strip_byte_order_mark(prefix)[0])
+        try:
+            unicode_markup = str(memoryview(markup)[bom_length:], encoding)
+        except (LookupError, UnicodeDecodeError):
+            return None
+        return (unicode_markup, encoding, None, False)
+
     def feed(self, markup):
         """Run some incoming markup through some parsing process,
         populating the `BeautifulSoup` object in self.soup.
@@ -13,6 +13,7 @@ except ImportError as e:
 
 from io import BytesIO
 from io import StringIO
+import sys
 from lxml import etree
 from bs4.element import (
     Comment,
@@ -241,8 +242,10 @@ class LXMLTreeBuilderForXML(TreeBuilder):
         self.nsmaps = [self.DEFAULT_NSMAPS_INVERTED]
 
     def start(self, name, attrs, nsmap={}):
-        # Make sure attrs is a mutable dict--lxml may send an immutable dictproxy.
-        attrs = dict(attrs)
+        # Make sure attrs is a mutable dict--lxml may send an immutable
+        # dictproxy. Attribute names repeat on every tag, so they share
+        # one string object per name.
+        attrs = {sys.intern(key): value for key, value in attrs.items()}
         nsprefix = None
         # Invert each namespace map as it comes in.
         if len(nsmap) == 0 and len(self.nsmaps) > 1:
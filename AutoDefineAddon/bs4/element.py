@@ -8,6 +8,7 @@ except ImportError as e:
 import re
 import sys
 import warnings
+from functools import lru_cache
 try:
     import soupsieve
 except ImportError as e:
@@ -42,6 +43,27 @@ def _alias(attr):
     return alias
 
 
+# The namespaces of every Tag that isn't given any. It's never
+# modified.
+_NO_NAMESPACES = {}
+
+
+def _clear_attributes(element):
+    """Remove every attribute of a PageElement, the ones in its
+    __slots__ as well as the ones in its __dict__."""
+    for cls in type(element).__mro__:
+        for attr in cls.__dict__.get('__slots__', ()):
+            if attr == '__dict__':
+                continue
+            try:
+                delattr(element, attr)
+            except AttributeError:
+                pass
+    instance_dict = getattr(element, '__dict__', None)
+    if instance_dict is not None:
+        instance_dict.clear()
+
+
 # These encodings are recognized by Python (so PageElement.encode
 # could theoretically support them) but XML and HTML don't recognize
 # them (so they should not show up in an XML or HTML document as that
@@ -153,7 +175,12 @@ class PageElement(object):
 
     NavigableString, Tag, etc. are all subclasses of PageElement.
     """
-   
+
+    # The links are stored in the __slots__ of Tag. NavigableString
+    # subclasses str, which can't have nonempty __slots__, so strings
+    # keep them in their __dict__.
+    __slots__ = ()
+
     def setup(self, parent=None, previous_element=None, next_element=None,
               previous_sibling=None, next_sibling=None):
         """Sets up the initial relations between this element and
@@ -916,6 +943,31 @@ class PageElement(object):
         return self.parents
 
 
+# Number of selector strings whose compiled form select() keeps. SoupSieve
+# has a cache of its own, but it is looked up only after the namespaces
+# and flags of every call have been converted.
+SELECTOR_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def _cached_selector(selector, namespaces, flags):
+    return soupsieve.compile(selector, dict(namespaces), flags)
+
+
+def _compile_selector(selector, namespaces, kwargs):
+    """Compile a selector string, reusing the result for the same
+    (selector, namespaces, flags).
+    """
+    if any(key != 'flags' for key in kwargs):
+        # custom selectors are dictionaries, they can't be a cache key
+        return soupsieve.compile(selector, namespaces, **kwargs)
+    if namespaces:
+        namespaces = tuple(sorted(namespaces.items()))
+    else:
+        namespaces = ()
+    return _cached_selector(selector, namespaces, kwargs.get('flags', 0))
+
+
 class NavigableString(str, PageElement):
     """A Python Unicode string that is part of a parse tree.
 
@@ -1177,6 +1229,19 @@ class Tag(PageElement):
     create a Tag object representing the <b> tag.
     """
 
+    # A parsed page has thousands of tags, slots keep each of them
+    # much smaller than an instance __dict__ would. The __dict__ slot
+    # is only filled when some other attribute is set on a tag.
+    __slots__ = (
+        'parent', 'previous_element', 'next_element',
+        'previous_sibling', 'next_sibling',
+        'parser_class', 'name', 'namespace', '_namespaces', 'prefix',
+        'sourceline', 'sourcepos', 'known_xml', 'attrs', 'contents',
+        'hidden', 'can_be_empty_element', 'cdata_list_attributes',
+        'preserve_whitespace_tags', 'interesting_string_types',
+        '_decomposed', '__dict__',
+    )
+
     def __init__(self, parser=None, builder=None, name=None, namespace=None,
                  prefix=None, attrs=None, parent=None, previous=None,
                  is_xml=None, sourceline=None, sourcepos=None,
@@ -1228,9 +1293,15 @@ class Tag(PageElement):
             self.parser_class = parser.__class__
         if name is None:
             raise ValueError("No value provided for new tag's name.")
+        # Tag names repeat all over a document, so they share one
+        # string object per name.
+        if type(name) is str:
+            name = sys.intern(name)
         self.name = name
         self.namespace = namespace
-        self._namespaces = namespaces or {}
+        # Only a BeautifulSoup object adds to its namespaces, see
+        # BeautifulSoup.reset().
+        self._namespaces = namespaces or _NO_NAMESPACES
         self.prefix = prefix
         if ((not builder or builder.store_line_numbers)
             and (sourceline is not None or sourcepos is not None)):
@@ -1413,7 +1484,7 @@ class Tag(PageElement):
         i = self
         while i is not None:
             n = i.next_element
-            i.__dict__.clear()
+            _clear_attributes(i)
             i.contents = []
             i._decomposed = True
             i = n
@@ -1945,7 +2016,10 @@ class Tag(PageElement):
 
         This uses the SoupSieve library.
 
-        :param selector: A string containing a CSS selector.
+        :param selector: A string containing a CSS selector, or a
+           selector compiled with soupsieve.compile(). A compiled
+           selector already has its namespaces and flags, `namespaces`
+           and `kwargs` are ignored for it.
 
         :param namespaces: A dictionary mapping namespace prefixes
            used in the CSS selector to namespace URIs. By default,
@@ -1970,7 +2044,9 @@ class Tag(PageElement):
                 "Cannot execute CSS selectors because the soupsieve package is not installed."
             )
             
-        results = soupsieve.select(selector, self, namespaces, limit, **kwargs)
+        if not isinstance(selector, soupsieve.SoupSieve):
+            selector = _compile_selector(selector, namespaces, kwargs)
+        results = selector.select(self, limit)
 
         # We do this because it's more consistent and because
         # ResultSet.__getattr__ has a helpful error message.
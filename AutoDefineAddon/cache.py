@@ -0,0 +1,249 @@
+""" caches of extracted dictionary entries """
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+# bump when the format of cached values changes, old databases are then cleared on open
+CACHE_VERSION = 1
+
+USER_FILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'user_files')
+
+
+class InfoCache(object):
+    """ Word.info() dicts keyed by page url, stored zlib-compressed in a SQLite file
+
+    Entries older than ttl_seconds are treated as missing. When the total size of stored values
+    exceeds max_size_bytes the least recently used entries are evicted.
+    A value of None is a valid cache entry and means "word not found", it is kept only for
+    negative_ttl_seconds since a missing page may be a temporary error of the website.
+    The file is created on the first get() or put(), not when the cache is made.
+    """
+
+    def __init__(self, path, ttl_seconds, max_size_bytes, negative_ttl_seconds=None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.lock = threading.Lock()
+        self.connection = None
+        self.total_size = 0
+
+    def _connect(self):
+        if self.connection is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        if connection.execute('PRAGMA user_version').fetchone()[0] != CACHE_VERSION:
+            connection.execute('DROP TABLE IF EXISTS entries')
+            connection.execute('PRAGMA user_version=%d' % CACHE_VERSION)
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'url TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+            'created REAL NOT NULL, last_access REAL NOT NULL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)')
+        self.total_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        self.connection = connection
+
+    def get(self, url):
+        """ return (True, value) for a fresh entry, (False, None) otherwise """
+        now = time.time()
+        try:
+            with self.lock:
+                self._connect()
+                row = self.connection.execute(
+                    'SELECT value, created FROM entries WHERE url = ?', (url,)).fetchone()
+                if row is None:
+                    return False, None
+                data, created = row
+                value = json.loads(zlib.decompress(data).decode('utf-8'))
+                if now - created > (self.ttl_seconds if value is not None else self.negative_ttl_seconds):
+                    self._delete(url)
+                    return False, None
+                self.connection.execute('UPDATE entries SET last_access = ? WHERE url = ?', (now, url))
+        except (sqlite3.Error, OSError):
+            return False, None
+        return True, value
+
+    def put(self, url, value):
+        """ store value, evicting least recently used entries when the size limit is reached """
+        data = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        try:
+            with self.lock:
+                self._connect()
+                self._delete(url)
+                self.connection.execute(
+                    'INSERT INTO entries (url, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)',
+                    (url, data, len(data), now, now))
+                self.total_size += len(data)
+                self._evict()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def clear(self):
+        with self.lock:
+            self._connect()
+            self.connection.execute('DELETE FROM entries')
+            self.total_size = 0
+
+    def _delete(self, url):
+        row = self.connection.execute('SELECT size FROM entries WHERE url = ?', (url,)).fetchone()
+        if row is not None:
+            self.connection.execute('DELETE FROM entries WHERE url = ?', (url,))
+            self.total_size -= row[0]
+
+    def _evict(self):
+        while self.total_size > self.max_size_bytes:
+            rows = self.connection.execute(
+                'SELECT url, size FROM entries ORDER BY last_access LIMIT 64').fetchall()
+            if not rows:
+                self.total_size = 0
+                return
+            for url, size in rows:
+                self.connection.execute('DELETE FROM entries WHERE url = ?', (url,))
+                self.total_size -= size
+                if self.total_size <= self.max_size_bytes:
+                    return
+
+
+class LookupMemo(object):
+    """ shares page lookups between callers
+
+    Concurrent lookups of the same key run once and every caller gets that result. While a batch is
+    open, results are also kept for later callers, up to max_entries least recently used ones.
+    Failed lookups are never kept. `saved` counts the lookups that were served without running.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.futures = OrderedDict()
+        self.batches = 0
+        self.saved = 0
+
+    @contextmanager
+    def batch(self):
+        with self.lock:
+            self.batches += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.batches -= 1
+                if self.batches == 0:
+                    for key, future in list(self.futures.items()):
+                        if future.done():
+                            del self.futures[key]
+
+    def get(self, key, load):
+        """ result of load() for key, shared with the other callers asking for the same key """
+        with self.lock:
+            future = self.futures.get(key)
+            if future is None:
+                future = self.futures[key] = Future()
+                owner = True
+            else:
+                self.futures.move_to_end(key)
+                self.saved += 1
+                owner = False
+        if not owner:
+            return future.result()
+
+        try:
+            value = load()
+        except BaseException as ex:
+            with self.lock:
+                self._forget(key, future)
+            future.set_exception(ex)
+            raise
+
+        with self.lock:
+            if self.batches == 0:
+                self._forget(key, future)
+            while len(self.futures) > self.max_entries:
+                self.futures.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def add(self, key, value):
+        """ keep value as the result of key while a batch is open, e.g. for a page found under another key """
+        with self.lock:
+            if self.batches == 0 or key in self.futures:
+                return
+            future = self.futures[key] = Future()
+            future.set_result(value)
+            while len(self.futures) > self.max_entries:
+                self.futures.popitem(last=False)
+
+    def _forget(self, key, future):
+        if self.futures.get(key) is future:
+            del self.futures[key]
+
+
+class Prefetcher(object):
+    """ runs load(key) in the background for the key the user is most likely to ask for next
+
+    Only the latest key is kept. Prefetching another key cancels the previous lookup if it has not
+    started yet, a running one finishes but its result is dropped. A result is handed out once and
+    only within ttl_seconds of starting the lookup, failed lookups are not handed out at all.
+    """
+
+    def __init__(self, load, ttl_seconds, max_workers=2):
+        self.load = load
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.executor = None
+        self.key = None
+        self.future = None
+        self.started = 0
+
+    def prefetch(self, key):
+        with self.lock:
+            if key == self.key and self.future is not None and not self._expired():
+                return
+            self._discard()
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix='AutoDefinePrefetch')
+            self.key = key
+            self.started = time.monotonic()
+            self.future = self.executor.submit(self.load, key)
+
+    def take(self, key):
+        """ future of the prefetched load(key), None when there is no usable one """
+        with self.lock:
+            if self.future is None or key != self.key or self._expired():
+                self._discard()
+                return None
+            future = self.future
+            self.key = None
+            self.future = None
+        if future.done() and future.exception() is not None:
+            return None
+        return future
+
+    def discard(self):
+        with self.lock:
+            self._discard()
+
+    def _discard(self):
+        if self.future is not None:
+            self.future.cancel()
+        self.key = None
+        self.future = None
+
+    def _expired(self):
+        return time.monotonic() - self.started > self.ttl_seconds
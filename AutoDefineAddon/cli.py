@@ -0,0 +1,218 @@
+""" define words without Anki
+
+usage: python -m AutoDefineAddon.cli WORDS_FILE [--output FILE] [--media DIR --import-file FILE]
+                                    [--workers N] [--processes N] [--config FILE] [--no-cache]
+
+Runs the lookup pipeline of the add-on for every line of WORDS_FILE ("-" reads stdin) and streams
+one JSON line per word, in input order. With --media pronunciations are downloaded into DIR and
+--import-file writes a tab separated file for File > Import into the AutoDefine note type.
+Throughput stats are printed to stderr. aqt is never imported, requests has to be installed.
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_FILE_HEADER = [
+    '#separator:tab',
+    '#html:true',
+    '#notetype:AutoDefineOxfordLearnersDictionary',
+    '#columns:Word\tDefinitionAndExamples\tAudio\tPhonetics\tVerbForms\tImage\tTags',
+    '#tags column:7',
+]
+
+WORD_NOT_REPLACED_TAG_NAME = "AutoDefine_WordNotReplaced"
+
+# set by load_pipeline(), the pipeline reads its config when imported
+pipeline = None
+oxford = None
+
+
+def load_pipeline(config_path=None, cache=True, base_url=None, processes=1):
+    """ import pipeline with the given config, in the main process and in every worker process """
+    global pipeline, oxford
+    if config_path:
+        os.environ['AUTODEFINE_CONFIG'] = config_path
+    if importlib.util.find_spec('bs4') is None:
+        # fall back to the copy shipped with the add-on
+        sys.path.append(ADDON_DIR)
+    from . import oxford as oxford_module, pipeline as module
+    pipeline, oxford = module, oxford_module
+    # the parser is chosen inside Anki, every process here uses its saved decision or html.parser
+    pipeline.parser_choice.pin()
+    if not cache:
+        pipeline.info_cache = None
+    if base_url:
+        pipeline.Word.BASE_URL = base_url
+    if processes > 1:
+        # every process has its own rate limiter, together they keep to the configured rate
+        pipeline.Session.configure(max_requests_per_second=pipeline.MAX_REQUESTS_PER_SECOND / processes)
+
+
+def print_reports():
+    """ print what the pipeline could not set up, e.g. an unreadable pack """
+    for message in pipeline.reports:
+        print(f"AutoDefine: {message}", file=sys.stderr)
+
+
+def define_word(word, media_dir=None):
+    """ the fields AutoDefine fills for word as a dict, error is set when the word is not defined """
+    record = {'word': word, 'error': None}
+    try:
+        words_info = pipeline.get_words_info(word)
+        if len(words_info) == 0:
+            record['error'] = "Word not found in dictionary"
+            return record
+
+        verb_forms = pipeline.get_verb_forms(words_info)
+        definition, word_not_replaced = pipeline.get_definition_html(words_info, verb_forms)
+        record.update({
+            'name': pipeline.get_word_name(words_info),
+            'definition': definition,
+            'word_not_replaced': word_not_replaced,
+            'phonetics': pipeline.get_phonetics(words_info),
+            'verb_forms': ' '.join(verb_forms),
+            'audio_files': pipeline.get_audio_files(pipeline.get_audio_dict(words_info)),
+        })
+        if record['name'] != word:
+            record['error'] = f"Found definition for word '{record['name']}' instead"
+        if media_dir is not None:
+            record['audio'] = pipeline.get_audio(words_info, media_dir)
+    except oxford.RateLimited:
+        record['error'] = "The dictionary is refusing requests right now, please try again later"
+    except Exception as ex:
+        record['error'] = f"{type(ex).__name__}: {ex}"
+    return record
+
+
+def iter_definitions(words, workers, media_dir=None):
+    """ yield define_word() records in words order while up to 2 * workers lookups run """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for word in words:
+            pending.append(executor.submit(define_word, word, media_dir))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def define_chunk(words, workers, media_dir):
+    """ run in a worker process: return (records, lookups saved by page_lookups) """
+    saved_before = pipeline.page_lookups.saved
+    with pipeline.page_lookups.batch():
+        records = list(iter_definitions(words, workers, media_dir))
+    return records, pipeline.page_lookups.saved - saved_before
+
+
+def chunks(words, size):
+    for start in range(0, len(words), size):
+        yield words[start:start + size]
+
+
+def define_all(words, args):
+    """ yield (record, lookups saved so far) in words order """
+    if args.processes <= 1:
+        saved_before = pipeline.page_lookups.saved
+        with pipeline.page_lookups.batch():
+            for record in iter_definitions(words, args.workers, args.media):
+                yield record, pipeline.page_lookups.saved - saved_before
+        return
+
+    # parsing holds the GIL, processes spread it over cores, threads in each process wait for the network
+    saved = 0
+    context = multiprocessing.get_context('spawn')
+    initargs = (args.config, not args.no_cache, args.base_url, args.processes)
+    with context.Pool(args.processes, initializer=load_pipeline, initargs=initargs) as pool:
+        define = partial(define_chunk, workers=args.workers, media_dir=args.media)
+        for records, chunk_saved in pool.imap(define, chunks(words, args.chunk_size)):
+            saved += chunk_saved
+            for record in records:
+                yield record, saved
+
+
+def import_row(record):
+    tags = [WORD_NOT_REPLACED_TAG_NAME] if record['word_not_replaced'] else []
+    return [record['word'], record['definition'], record.get('audio', ''), record['phonetics'],
+            record['verb_forms'], '', ' '.join(tags)]
+
+
+def read_words(path):
+    file = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    with file:
+        words = [' '.join(line.split()) for line in file]
+    return [word for word in words if word]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m AutoDefineAddon.cli', description=__doc__.splitlines()[0])
+    parser.add_argument('words', help='file with one word per line, - for stdin')
+    parser.add_argument('--output', default='-', help='JSON lines output, - for stdout (default)')
+    parser.add_argument('--media', help='download pronunciations into this folder')
+    parser.add_argument('--import-file', help='write an Anki import file, use together with --media')
+    parser.add_argument('--workers', type=int, default=None, help='threads per process (default BULK_WORKERS)')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=100, help='words handed to a process at once')
+    parser.add_argument('--config', help='JSON file overriding sections of config.json')
+    parser.add_argument('--no-cache', action='store_true', help='do not use user_files/cache.sqlite3')
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.config:
+        args.config = os.path.abspath(args.config)
+    if args.media:
+        args.media = os.path.abspath(args.media)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_pipeline(args.config, not args.no_cache, args.base_url)
+    print_reports()
+    if args.workers is None:
+        args.workers = pipeline.BULK_WORKERS
+    if args.media:
+        os.makedirs(args.media, exist_ok=True)
+
+    words = read_words(args.words)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    import_file = None
+    if args.import_file:
+        import_file = open(args.import_file, 'w', encoding='utf-8', newline='')
+        import_file.write('\n'.join(IMPORT_FILE_HEADER) + '\n')
+        import_writer = csv.writer(import_file, delimiter='\t', lineterminator='\n')
+
+    start = time.perf_counter()
+    defined = errors = saved = 0
+    try:
+        for record, saved in define_all(words, args):
+            output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if record['error'] is None:
+                defined += 1
+                if import_file is not None:
+                    import_writer.writerow(import_row(record))
+            else:
+                errors += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if import_file is not None:
+            import_file.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(words)} words in {elapsed:.1f} s, {len(words) / max(elapsed, 1e-9):.1f} words/s: "
+          f"{defined} defined, {errors} errors, {saved} duplicate lookups skipped", file=sys.stderr)
+    return 1 if errors and not defined else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+""" on-disk progress of bulk runs, so an interrupted run can skip the notes it already defined """
+
+import json
+import os
+import threading
+import time
+
+
+class BulkJournal(object):
+    """ append-only JSON lines file with one record per finished note
+
+    The first line describes the run, every following line is
+    {"nid": note id, "status": "done" or "error", "error": error text, "config": config fingerprint}.
+    The file is removed when the run completes, so an existing file means an interrupted run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def read(self):
+        """ return (run description, records) of an interrupted run, (None, []) if there is none """
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None, []
+
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # the last line may be cut short by a crash
+                continue
+        if not entries or 'nid' in entries[0]:
+            return None, []
+        return entries[0], entries[1:]
+
+    def completed(self, fingerprint):
+        """ ids of the notes an interrupted run defined with the same config """
+        _, records = self.read()
+        return set(record['nid'] for record in records
+                   if record.get('status') == 'done' and record.get('config') == fingerprint)
+
+    def start(self, notes_count, fingerprint, resume):
+        """ open the journal, appending to the interrupted run when resume is set """
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+            if resume:
+                # ends a line that may have been cut short, empty lines are skipped when reading
+                self.file.write('\n')
+            else:
+                self._write({'started': time.time(), 'notes': notes_count, 'config': fingerprint})
+
+    def record(self, nid, status, error, fingerprint):
+        with self.lock:
+            self._write({'nid': nid, 'status': status, 'error': error, 'config': fingerprint})
+
+    def close(self):
+        """ close the journal, it is kept for resuming the run """
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def finish(self):
+        """ close and remove the journal of a completed run """
+        self.close()
+        with self.lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _write(self, entry):
+        # flushed per line, a crash loses at most the note being written
+        self.file.write(json.dumps(entry) + '\n')
+        self.file.flush()
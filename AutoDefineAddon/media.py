@@ -0,0 +1,103 @@
+""" concurrent download of pronunciation files into collection.media """
+
+import contextvars
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def write_atomic(path, content):
+    """ write content to a temporary file next to path and rename it, so path is never half written """
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(prefix='.autodefine-', suffix='.part', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class MediaIndex(object):
+    """ names of the files in a media folder, listed once instead of calling os.path.exists per file """
+
+    def __init__(self, media_dir):
+        self.media_dir = media_dir
+        self.lock = threading.Lock()
+        try:
+            self.names = set(os.listdir(media_dir))
+        except FileNotFoundError:
+            self.names = set()
+
+    def __contains__(self, name):
+        with self.lock:
+            return name in self.names
+
+    def add(self, name):
+        with self.lock:
+            self.names.add(name)
+
+
+class AudioDownloader(object):
+    """ downloads audio files with a bounded pool of threads
+
+    Every file is downloaded once: files already in the media index are skipped and
+    concurrent requests for the same file share one download.
+    """
+
+    def __init__(self, fetch, workers):
+        self.fetch = fetch
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.executor = None
+        self.index = None
+        self.in_flight = {}
+
+    def reset_index(self):
+        """ list the media folder again on next use, e.g. after files were removed by Check Media """
+        with self.lock:
+            self.index = None
+
+    def media_index(self, media_dir):
+        with self.lock:
+            if self.index is None or self.index.media_dir != media_dir:
+                self.index = MediaIndex(media_dir)
+            return self.index
+
+    def prefetch(self, media_dir, audio_files):
+        """ start downloading missing (audio_name, audio_url) files, return their futures """
+        index = self.media_index(media_dir)
+        futures = []
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='AutoDefineAudio')
+            for audio_name, audio_url in audio_files:
+                if audio_name in index:
+                    continue
+                future = self.in_flight.get(audio_name)
+                if future is None:
+                    # e.g. the wait limit of Session.waiting_at_most() applies to the download as well
+                    future = self.executor.submit(contextvars.copy_context().run,
+                                                  self._download, index, audio_name, audio_url)
+                    self.in_flight[audio_name] = future
+                futures.append(future)
+        return futures
+
+    def download(self, media_dir, audio_files):
+        """ download missing files and wait for them, errors are raised """
+        for future in self.prefetch(media_dir, audio_files):
+            future.result()
+
+    def _download(self, index, audio_name, audio_url):
+        try:
+            content = self.fetch(audio_url)
+            write_atomic(os.path.join(index.media_dir, audio_name), content)
+            index.add(audio_name)
+        finally:
+            with self.lock:
+                self.in_flight.pop(audio_name, None)
@@ -0,0 +1,67 @@
+""" load the vendored nltk without running its heavy package __init__ """
+
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modules')
+
+_lock = threading.RLock()
+
+
+@contextmanager
+def add_to_path(p):
+    old_path = sys.path
+    sys.path = sys.path[:]
+    sys.path.insert(0, str(p))
+    try:
+        yield
+    finally:
+        sys.path = old_path
+
+
+def lazy_package(name):
+    """ register package `name` from MODULES_DIR without executing its __init__.py
+
+    Submodules can be imported right away. The real __init__.py runs on first access to a
+    name it defines, so code expecting the complete package keeps working.
+    """
+    directory = os.path.join(MODULES_DIR, *name.split('.'))
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(directory, '__init__.py'), submodule_search_locations=[directory])
+    module = importlib.util.module_from_spec(spec)
+    loaded = []
+
+    def __getattr__(attr):
+        if attr.startswith('__') and attr != '__all__':
+            raise AttributeError(attr)
+        with _lock:
+            if not loaded:
+                loaded.append(True)
+                with add_to_path(MODULES_DIR):
+                    spec.loader.exec_module(module)
+        if attr in module.__dict__:
+            return module.__dict__[attr]
+        raise AttributeError("module %r has no attribute %r" % (name, attr))
+
+    module.__getattr__ = __getattr__
+    sys.modules[name] = module
+
+    parent_name, _, child_name = name.rpartition('.')
+    if parent_name:
+        setattr(sys.modules[parent_name], child_name, module)
+    return module
+
+
+def load_nltk():
+    """ return (PorterStemmer, wordpunct_tokenize), importing only nltk.stem.porter and nltk.tokenize.regexp """
+    with _lock:
+        for name in ('nltk', 'nltk.stem', 'nltk.tokenize'):
+            lazy_package(name)
+        with add_to_path(MODULES_DIR):
+            porter = importlib.import_module('nltk.stem.porter')
+            regexp = importlib.import_module('nltk.tokenize.regexp')
+    return porter.PorterStemmer, regexp.wordpunct_tokenize
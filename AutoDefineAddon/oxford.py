@@ -33,10 +33,25 @@
 
 """ oxford dictionary api """
 
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.message import Message
+from email.utils import parsedate_to_datetime
 from http import cookiejar
 
 import requests
-from bs4 import BeautifulSoup as soup
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+import soupsieve
+from bs4 import BeautifulSoup as soup, SoupStrainer
+from bs4.element import Tag
+
+from .timing import recorder
 
 
 class WordNotFound(Exception):
@@ -44,6 +59,11 @@ class WordNotFound(Exception):
     pass
 
 
+class RateLimited(Exception):
+    """ the site keeps answering with 429 or 503, the request was given up """
+    pass
+
+
 class BlockAll(cookiejar.CookiePolicy):
     """ policy to block cookies """
     return_ok = set_ok = domain_return_ok = path_return_ok = lambda self, *args, **kwargs: False
@@ -51,116 +71,804 @@ class BlockAll(cookiejar.CookiePolicy):
     rfc2965 = hide_cookie2 = False
 
 
-class Word(object):
-    """ retrive word info from oxford dictionary website """
-    entry_selector = '#entryContent > .entry'
-    header_selector = '.top-container'
+def retry_after_seconds(value, now=None):
+    """ seconds to wait from a Retry-After header given in seconds or as an HTTP date, None if missing """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - (time.time() if now is None else now))
+
+
+class RateLimiter(object):
+    """ token bucket for request starts with an AIMD limit on requests in flight
+
+    At most `rate` requests start per second. The number of requests in flight grows by one per
+    `limit` healthy responses up to max_concurrency, and is halved when the site answers with
+    429/503, a request fails or the p95 latency of the last responses doubles compared to the
+    best seen so far. Retry-After pauses all new requests.
+    """
+    LATENCY_WINDOW = 50
+    LATENCY_FACTOR = 2.0
+    DEFAULT_PAUSE = 1.0  # seconds, when 429/503 come without Retry-After
+    MAX_PAUSE = 600.0
+
+    def __init__(self, rate, max_concurrency, min_concurrency=1):
+        self.rate = float(rate)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(min(max_concurrency, max(min_concurrency, 4)))
+        self.condition = threading.Condition()
+        self.tokens = self.rate
+        self.refilled = time.monotonic()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.responses = 0
+        self.decreased_at = None
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.best_p95 = None
+
+    def acquire(self, deadline=None):
+        """ wait until a request may start, return the start time to pass to release()
+
+        None is returned right away when the request could not start before deadline, a time.monotonic() value.
+        """
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.refilled) * self.rate)
+                self.refilled = now
+                if self.in_flight >= int(self.limit):
+                    # until release() is called
+                    wake = None
+                elif now < self.paused_until:
+                    wake = self.paused_until
+                elif self.tokens < 1:
+                    wake = now + (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return now
+                if deadline is not None:
+                    if now >= deadline or (wake is not None and wake > deadline):
+                        return None
+                    wake = deadline if wake is None else wake
+                self.condition.wait(None if wake is None else wake - now)
+
+    def release(self, start, status=None, retry_after=None):
+        """ report the outcome of a request, status is None when it failed without a response """
+        now = time.monotonic()
+        with self.condition:
+            self.in_flight -= 1
+            self.responses += 1
+            if status is None or status in Session.THROTTLE_STATUSES:
+                if status is not None:
+                    pause = self.DEFAULT_PAUSE if retry_after is None else min(retry_after, self.MAX_PAUSE)
+                    self.paused_until = max(self.paused_until, now + pause)
+                self._decrease()
+            else:
+                self.latencies.append(now - start)
+                if self._latency_rising():
+                    self._decrease()
+                else:
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def _latency_rising(self):
+        if len(self.latencies) < self.LATENCY_WINDOW:
+            return False
+        p95 = sorted(self.latencies)[int(len(self.latencies) * 0.95)]
+        if self.best_p95 is None or p95 < self.best_p95:
+            self.best_p95 = p95
+        return p95 > self.best_p95 * self.LATENCY_FACTOR
+
+    def _decrease(self):
+        # responses to requests sent before the last decrease do not decrease again
+        if self.decreased_at is not None and self.responses - self.decreased_at < self.limit:
+            return
+        self.decreased_at = self.responses
+        self.limit = max(self.min_concurrency, self.limit / 2)
+        self.latencies.clear()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """ DNS lookup and TCP handshake are recorded as the connect span """
+
+    def connect(self):
+        with recorder.span('connect'):
+            super().connect()
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """ DNS lookup, TCP and TLS handshakes are recorded as the connect span """
+
+    def connect(self):
+        with recorder.span('connect'):
+            super().connect()
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool,
+                                                   'https': TimedHTTPSConnectionPool}
+
+
+class Session(object):
+    """ settings of the requests.Session shared by all lookups
+
+    One session is created lazily and reused from every thread, so connections to the
+    dictionary are kept alive between requests. Cookies are blocked, which leaves the
+    session without mutable per-request state.
+    """
+    POOL_SIZE = 10
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+    RETRY_STATUSES = (500, 502, 504)
+    # answers of an overloaded site, handled by the rate limiter instead of urllib3
+    THROTTLE_STATUSES = (429, 503)
+    TIMEOUT = (5, 15)  # (connect, read) seconds
+    MAX_REQUESTS_PER_SECOND = 20
+    # seconds the requests of a thread may spend waiting for the rate limiter, None waits as long as
+    # the site asks, set with waiting_at_most()
+    _max_wait = ContextVar('max_wait', default=None)
+
+    _session = None
+    _limiter = None
+    _lock = threading.Lock()
 
-    # remove proxy - disabled by default but may be added to config in future.
-    PROXIES = {
-        #todo do not push until commented back
-        #'http': 'http://127.0.0.1:8118',
-        #'https': 'http://127.0.0.1:8118',
-    }
+    @classmethod
+    def configure(cls, pool_size=None, retries=None, backoff_factor=None, timeout=None,
+                  max_requests_per_second=None):
+        """ change settings, the shared session and rate limiter are rebuilt on next request """
+        with cls._lock:
+            if pool_size is not None:
+                cls.POOL_SIZE = pool_size
+            if retries is not None:
+                cls.RETRIES = retries
+            if backoff_factor is not None:
+                cls.BACKOFF_FACTOR = backoff_factor
+            if timeout is not None:
+                cls.TIMEOUT = timeout
+            if max_requests_per_second is not None:
+                cls.MAX_REQUESTS_PER_SECOND = max_requests_per_second
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+            cls._limiter = None
 
-    title_selector = header_selector + ' .headword'
-    wordform_selector = header_selector + ' .pos'
-    property_global_selector = header_selector + ' .grammar'
+    @classmethod
+    def limiter(cls):
+        """ return the RateLimiter shared by all requests to the site """
+        with cls._lock:
+            if cls._limiter is None:
+                cls._limiter = RateLimiter(cls.MAX_REQUESTS_PER_SECOND, max_concurrency=cls.POOL_SIZE)
+            return cls._limiter
 
-    verb_forms_selector = 'tr.verb_form[form]'
-    verb_forms_selector_td = 'td.verb_form'
-    br_pronounce_selector = '[geo=br] .phon'
-    am_pronounce_selector = '[geo=n_am] .phon'
-    br_pronounce_audio_ogg_selector = '[geo=br] [data-src-ogg]'
-    am_pronounce_audio_ogg_selector = '[geo=n_am] [data-src-ogg]'
-    br_pronounce_audio_mp3_selector = '[geo=br] [data-src-mp3]'
-    am_pronounce_audio_mp3_selector = '[geo=n_am] [data-src-mp3]'
+    @classmethod
+    @contextmanager
+    def waiting_at_most(cls, seconds):
+        """ limit the wait of the requests this thread starts in the block, None lifts the limit
 
-    definition_body_selector = '.senses_multiple'
-    definition_body_selector_single = '.sense_single'
-    namespaces_selector = '.senses_multiple > .shcut-g'
-    examples_selector = '.senses_multiple .sense > .examples .x'
-    definitions_selector = '.senses_multiple .sense > .def'
+        The limit is kept in a context variable, work handed to other threads keeps it only when it
+        runs in a copy of the context, like AudioDownloader does.
+        """
+        token = cls._max_wait.set(seconds)
+        try:
+            yield
+        finally:
+            cls._max_wait.reset(token)
 
-    extra_examples_selector = '.res-g [title="Extra examples"] .x-gs .x'
-    phrasal_verbs_selector = '.phrasal_verb_links a'
-    idioms_selector = '.idioms > .idm-g'
+    @classmethod
+    def max_wait(cls):
+        return cls._max_wait.get()
 
-    other_results_selector = '#rightcolumn #relatedentries'
+    @classmethod
+    def request(cls, url, headers, proxies=None, timeout=None):
+        """ GET url through the rate limiter, 429/503 answers are retried after backing off
 
-    soup_data = None
+        Raises RateLimited when the site still refuses after RETRIES attempts, or right away when
+        the site asks to wait longer than max_wait() in total.
+        """
+        limiter = cls.limiter()
+        max_wait = cls.max_wait()
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        for _ in range(cls.RETRIES + 1):
+            with recorder.span('rate limit wait'):
+                start = limiter.acquire(deadline)
+            if start is None:
+                break
+            response = None
+            try:
+                response = cls.get().get(url, headers=headers, proxies=proxies,
+                                         timeout=cls.TIMEOUT if timeout is None else timeout)
+            finally:
+                if response is None:
+                    limiter.release(start)
+                else:
+                    limiter.release(start, response.status_code,
+                                    retry_after_seconds(response.headers.get('Retry-After')))
+            if response.status_code not in cls.THROTTLE_STATUSES:
+                return response
+            recorder.count('throttled')
+        raise RateLimited(url)
 
     @classmethod
-    def get_url(cls, word, is_search):
-        """ get url of word definition """
-        if is_search:
-            baseurl = 'https://www.oxfordlearnersdictionaries.com/search/english/?q='
-        else:
-            baseurl = 'https://www.oxfordlearnersdictionaries.com/definition/english/'
-        return baseurl + word
+    def get(cls):
+        """ return the shared requests.Session """
+        with cls._lock:
+            if cls._session is None:
+                cls._session = cls.create()
+            return cls._session
 
     @classmethod
-    def delete(cls, selector):
-        """ remove tag with specified selector in cls.soup_data """
+    def create(cls):
+        session = requests.Session()
+        session.cookies.set_policy(BlockAll())
+
+        # retry connection errors and 5xx answers with exponential backoff
+        retry = Retry(
+            total=cls.RETRIES,
+            backoff_factor=cls.BACKOFF_FACTOR,
+            status_forcelist=cls.RETRY_STATUSES,
+            raise_on_status=False,
+            # 429/503 with Retry-After are left to Session.request and the rate limiter
+            respect_retry_after_header=False,
+        )
+        adapter = TimedHTTPAdapter(pool_connections=2, pool_maxsize=cls.POOL_SIZE, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+
+class PageSoup(soup):
+    """ BeautifulSoup of a dictionary page that keeps only what WordPage reads
+
+    Only the subtrees with KEEP_IDS are built, and sections whose title is in SKIP_TITLES are
+    dropped while parsing, which removes the header, navigation, ads and scripts of the page.
+    """
+    KEEP_IDS = ['entryContent', 'relatedentries', 'search-results']
+
+    # unnecessary sections that give false positive results
+    SKIP_TITLES = frozenset([
+        'Oxford Collocations Dictionary',
+        'British/American',  # edge case: 'phone'
+        'Express Yourself',
+        'Collocations',
+        'Word Origin',
+    ])
+
+    def __init__(self, markup, features='html.parser', **kwargs):
+        kwargs.setdefault('parse_only', SoupStrainer(id=self.KEEP_IDS))
+        # WordPage never asks where a tag was in the page, the line numbers would only take memory
+        kwargs.setdefault('store_line_numbers', False)
+        super().__init__(markup, features, **kwargs)
+
+    def reset(self):
+        super().reset()
+        self.skip_name = None
+        self.skip_depth = 0
+
+    def handle_starttag(self, name, namespace, nsprefix, attrs, *args, **kwargs):
+        if self.skip_depth:
+            if name == self.skip_name:
+                self.skip_depth += 1
+            return None
+
+        if attrs and attrs.get('title') in self.SKIP_TITLES:
+            # an empty element has no end tag to wait for
+            if not self.builder.can_be_empty_element(name):
+                self.skip_name = name
+                self.skip_depth = 1
+            return None
+
+        return super().handle_starttag(name, namespace, nsprefix, attrs, *args, **kwargs)
+
+    def handle_endtag(self, name, *args, **kwargs):
+        if self.skip_depth:
+            if name == self.skip_name:
+                self.skip_depth -= 1
+            return
+        super().handle_endtag(name, *args, **kwargs)
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        super().handle_data(data)
+
+
+class EntryScan(object):
+    """ tags read by WordPage.info(), collected in a single walk over the page
+
+    Every field holds what the corresponding WordPage selector would return, in document order,
+    so info() no longer runs dozens of select() calls over the whole tree. Descendant selectors
+    match ancestors outside of the scope tag, like soupsieve does, and spans inside the headword
+    are ignored because WordPage.name() removes them before the other extractors run.
+    """
+    GEO = ('br', 'n_am')
+    AUDIO_ATTRS = ('data-src-ogg', 'data-src-mp3')
+
+    def __init__(self, soup_data):
+        self.entry = None
+        self.headword = None
+        self.pos = None
+        self.grammar = None
+        self.phon = dict.fromkeys(self.GEO)
+        self.audio = {(geo, attr): None for geo in self.GEO for attr in self.AUDIO_ATTRS}
+        self.namespaces = []
+        self.multiple_bodies = []
+        self.single_bodies = []
+        self.idioms = []
+        self.related = None
+        self.phrasal_links = []
+        self.verb_form_rows = []
+
+        # ancestors of the tag being visited
+        self.top_containers = 0
+        self.geo = dict.fromkeys(self.GEO, 0)
+        self.examples = 0
+        self.extra_examples_boxes = 0
+        self.extra_examples = 0
+        self.xrefs = 0
+        self.list_items = 0
+        self.phrasal_verb_links = 0
+        self.in_headword = False
+        self.open = {
+            'sense': [], 'namespace': [], 'body': [], 'idiom': [], 'related': [],
+            'dd': [], 'li': [], 'phrasal': [], 'row': [], 'td': [],
+        }
+
+        for child in soup_data.children:
+            if isinstance(child, Tag):
+                self.visit(child, (), None)
+
+    @staticmethod
+    def first(scopes, key, tag):
+        for scope in scopes:
+            if scope[key] is None:
+                scope[key] = tag
+
+    def visit(self, tag, parent_classes, parent_id):
+        name = tag.name
+        attrs = tag.attrs
+        classes = attrs.get('class') or ()
+        tag_id = attrs.get('id')
+        open_scopes = self.open
+
+        if self.in_headword and name == 'span':
+            return
+
+        # tags matched through the ancestors of this tag
+        if self.entry is None and parent_id == 'entryContent' and 'entry' in classes:
+            self.entry = tag
+
+        if self.top_containers:
+            if self.headword is None and 'headword' in classes:
+                self.headword = tag
+            if self.pos is None and 'pos' in classes:
+                self.pos = tag
+            if self.grammar is None and 'grammar' in classes:
+                self.grammar = tag
+
+        for geo in self.GEO:
+            if self.geo[geo]:
+                if self.phon[geo] is None and 'phon' in classes:
+                    self.phon[geo] = tag
+                for attr in self.AUDIO_ATTRS:
+                    if self.audio[geo, attr] is None and attr in attrs:
+                        self.audio[geo, attr] = tag
+
+        for scopes in (open_scopes['sense'], open_scopes['idiom']):
+            if scopes:
+                if 'grammar' in classes:
+                    self.first(scopes, 'grammar', tag)
+                if 'labels' in classes:
+                    self.first(scopes, 'labels', tag)
+                if 'dis-g' in classes:
+                    self.first(scopes, 'dis', tag)
+                if 'def' in classes:
+                    self.first(scopes, 'def', tag)
+                if 'idm-l' in classes:
+                    self.first(scopes, 'idm_l', tag)
+                if 'idm' in classes:
+                    self.first(scopes, 'idm', tag)
+                if self.xrefs and name == 'a':
+                    for scope in scopes:
+                        scope['references'].append(tag)
+
+        if open_scopes['sense']:
+            if 'x' in classes:
+                for sense in open_scopes['sense']:
+                    sense['x'].append(tag)
+                    if self.examples:
+                        sense['examples'].append(tag)
+            if self.extra_examples and 'unx' in classes:
+                for sense in open_scopes['sense']:
+                    sense['extra_examples'].append(tag)
+
+        if name == 'h2' and 'shcut' in classes:
+            self.first(open_scopes['namespace'], 'title', tag)
+
+        if open_scopes['related']:
+            if name == 'dt':
+                self.related['dt'].append(tag)
+            elif name == 'dd':
+                self.related['dd'].append({'items': [], 'links': []})
+        if open_scopes['dd']:
+            if name == 'li':
+                item = {'span': None, 'pos': None}
+                for dd in open_scopes['dd']:
+                    dd['items'].append(item)
+            elif name == 'a' and self.list_items:
+                for dd in open_scopes['dd']:
+                    dd['links'].append(tag)
+        if open_scopes['li']:
+            if name == 'span':
+                self.first(open_scopes['li'], 'span', tag)
+            elif name == 'pos':
+                self.first(open_scopes['li'], 'pos', tag)
+
+        if open_scopes['phrasal'] and 'xh' in classes:
+            self.first(open_scopes['phrasal'], 'xh', tag)
+
+        if open_scopes['row'] and name == 'td' and 'verb_form' in classes:
+            self.first(open_scopes['row'], 'td', tag)
+        if open_scopes['td'] and name == 'span' and 'vf_prefix' in classes:
+            self.first(open_scopes['td'], 'prefix', tag)
+
+        # scopes and ancestor counters for the descendants of this tag
+        pushed = []
+
+        if 'sense' in classes:
+            sense = {'grammar': None, 'labels': None, 'dis': None, 'def': None, 'idm_l': None, 'idm': None,
+                     'references': [], 'examples': [], 'extra_examples': [], 'x': []}
+            for scope in open_scopes['namespace'] + open_scopes['body'] + open_scopes['idiom']:
+                scope['senses'].append(sense)
+            pushed.append(('sense', sense))
+
+        if 'shcut-g' in classes and 'senses_multiple' in parent_classes:
+            namespace = {'title': None, 'senses': []}
+            self.namespaces.append(namespace)
+            pushed.append(('namespace', namespace))
+
+        if 'senses_multiple' in classes or 'sense_single' in classes:
+            body = {'senses': []}
+            if 'senses_multiple' in classes:
+                self.multiple_bodies.append(body)
+            if 'sense_single' in classes:
+                self.single_bodies.append(body)
+            pushed.append(('body', body))
+
+        if 'idm-g' in classes and 'idioms' in parent_classes:
+            idiom = {'grammar': None, 'labels': None, 'dis': None, 'def': None, 'idm_l': None, 'idm': None,
+                     'references': [], 'senses': []}
+            self.idioms.append(idiom)
+            pushed.append(('idiom', idiom))
+
+        if self.related is None and tag_id == 'relatedentries':
+            self.related = {'dt': [], 'dd': []}
+            pushed.append(('related', self.related))
+
+        if open_scopes['related'] and name == 'dd':
+            pushed.append(('dd', self.related['dd'][-1]))
+
+        if open_scopes['dd'] and name == 'li':
+            pushed.append(('li', open_scopes['dd'][-1]['items'][-1]))
+
+        if self.phrasal_verb_links and name == 'a':
+            link = {'tag': tag, 'xh': None}
+            self.phrasal_links.append(link)
+            pushed.append(('phrasal', link))
+
+        if name == 'tr' and 'verb_form' in classes and 'form' in attrs:
+            row = {'tag': tag, 'td': None, 'prefix': None}
+            self.verb_form_rows.append(row)
+            pushed.append(('row', row))
+
+        for row in open_scopes['row']:
+            if row['td'] is tag:
+                pushed.append(('td', row))
+
+        for key, scope in pushed:
+            open_scopes[key].append(scope)
+
+        is_headword = tag is self.headword
+        is_top_container = 'top-container' in classes
+        geo = attrs.get('geo')
+        is_geo = geo in self.geo
+        is_extra_examples_box = attrs.get('unbox') == 'extra_examples'
+        is_examples = 'examples' in classes
+        is_extra_examples = is_examples and self.extra_examples_boxes > 0
+        is_xrefs = 'xrefs' in classes
+        is_list_item = name == 'li'
+        is_phrasal_verb_links = 'phrasal_verb_links' in classes
+
+        self.in_headword |= is_headword
+        self.top_containers += is_top_container
+        if is_geo:
+            self.geo[geo] += 1
+        self.extra_examples_boxes += is_extra_examples_box
+        self.examples += is_examples
+        self.extra_examples += is_extra_examples
+        self.xrefs += is_xrefs
+        self.list_items += is_list_item
+        self.phrasal_verb_links += is_phrasal_verb_links
+
+        for child in tag.contents:
+            if isinstance(child, Tag):
+                self.visit(child, classes, tag_id)
+
+        if is_headword:
+            self.in_headword = False
+        self.top_containers -= is_top_container
+        if is_geo:
+            self.geo[geo] -= 1
+        self.extra_examples_boxes -= is_extra_examples_box
+        self.examples -= is_examples
+        self.extra_examples -= is_extra_examples
+        self.xrefs -= is_xrefs
+        self.list_items -= is_list_item
+        self.phrasal_verb_links -= is_phrasal_verb_links
+
+        for key, scope in pushed:
+            open_scopes[key].pop()
+
+    @staticmethod
+    def required(tag):
+        """ tag or IndexError, like select(...)[0] """
+        if tag is None:
+            raise IndexError
+        return tag
+
+    @staticmethod
+    def text(tag):
+        return tag.text if tag is not None else None
+
+    @staticmethod
+    def references(tags):
+        return [{'id': WordPage.extract_id(tag.attrs['href']), 'name': tag.text} for tag in tags]
+
+    def name(self):
+        name = self.required(self.headword)
+        for span_tag in name.find_all('span'):
+            span_tag.replace_with('')
+        return name.text.strip()
+
+    def pronunciations(self):
+        britain = {'prefix': None, 'ipa': None, 'ogg': None, 'mp3': None}
+        america = {'prefix': None, 'ipa': None, 'ogg': None, 'mp3': None}
+
+        if self.phon['br'] is not None and self.phon['n_am'] is not None:
+            britain['ipa'] = self.phon['br'].text
+            britain['prefix'] = 'BrE'
+            america['ipa'] = self.phon['n_am'].text
+            america['prefix'] = 'nAmE'
+
+        # filled in this order until the first missing one, like WordPage.pronunciations()
+        for pronunciation, geo, attr, key in ((britain, 'br', 'data-src-ogg', 'ogg'),
+                                              (america, 'n_am', 'data-src-ogg', 'ogg'),
+                                              (britain, 'br', 'data-src-mp3', 'mp3'),
+                                              (america, 'n_am', 'data-src-mp3', 'mp3')):
+            tag = self.audio[geo, attr]
+            if tag is None:
+                break
+            pronunciation[key] = tag.attrs[attr]
+
+        if britain['prefix'] is None and (britain['ogg'] or britain['mp3']):
+            britain['prefix'] = (WordPage.get_prefix_from_filename(britain['ogg'])
+                                 or WordPage.get_prefix_from_filename(britain['mp3']))
+
+        if america['prefix'] is None and (america['ogg'] or america['mp3']):
+            america['prefix'] = (WordPage.get_prefix_from_filename(america['ogg'])
+                                 or WordPage.get_prefix_from_filename(america['mp3']))
+
+        return [britain, america]
+
+    def definition(self, sense):
+        definition = {}
+
+        if sense['grammar'] is not None:
+            definition['property'] = sense['grammar'].text
+        if sense['labels'] is not None:
+            definition['label'] = sense['labels'].text
+        if sense['dis'] is not None:
+            definition['refer'] = sense['dis'].text
+
+        definition['references'] = self.references(sense['references'])
+        if not definition['references']:
+            definition.pop('references', None)
+
+        if sense['def'] is not None:
+            definition['description'] = sense['def'].text
+
+        definition['examples'] = [tag.text for tag in sense['examples']]
+        definition['extra_example'] = [tag.text for tag in sense['extra_examples']]
+        return definition
+
+    def definition_full(self):
+        info = []
+        for namespace in self.namespaces:
+            info.append({'namespace': self.text(namespace['title']),
+                         'definitions': [self.definition(sense) for sense in namespace['senses']]})
+
+        # no namespace. all definitions is global
+        if len(info) == 0:
+            bodies = self.multiple_bodies or self.single_bodies
+            info.append({'namespace': '__GLOBAL__',
+                         'definitions': [self.definition(sense) for body in bodies for sense in body['senses']]})
+        return info
+
+    def idiom_list(self):
+        idioms = []
+        for idiom in self.idioms:
+            name = self.required(idiom['idm_l'] or idiom['idm']).text
+
+            global_definition = {}
+            if idiom['labels'] is not None:
+                global_definition['label'] = idiom['labels'].text
+            if idiom['dis'] is not None:
+                global_definition['refer'] = idiom['dis'].text
+            global_definition['references'] = self.references(idiom['references'])
+            if not global_definition['references']:
+                global_definition.pop('references', None)
+
+            definitions = []
+            for sense in idiom['senses']:
+                definition = {}
+                if sense['def'] is not None:
+                    definition['description'] = sense['def'].text
+                if sense['labels'] is not None:
+                    definition['label'] = sense['labels'].text
+                if sense['dis'] is not None:
+                    definition['refer'] = sense['dis'].text
+                definition['references'] = self.references(sense['references'])
+                if not definition['references']:
+                    definition.pop('references', None)
+                definition['examples'] = [tag.text for tag in sense['x']]
+                definitions.append(definition)
+
+            idioms.append({'name': name, 'summary': global_definition, 'definitions': definitions})
+        return idioms
+
+    def other_results(self):
+        if self.related is None:
+            return None
+
+        info = []
+        for header_tag, dd in zip(self.related['dt'], self.related['dd']):
+            other_results = []
+            for item in dd['items']:
+                names = self.required(item['span']).find_all(text=True, recursive=False)
+                names.append(item['pos'].text if item['pos'] is not None else '')
+                other_results.append(names)
+
+            other_results = list(filter(None, other_results))  # remove empty list
+            ids = [WordPage.extract_id(tag.attrs['href']) for tag in dd['links']]
+
+            results = []
+            for other_result, id in zip(other_results, ids):
+                result = {'name': ' '.join(list(map(lambda x: x.strip(), other_result[0:-1]))), 'id': id}
+                try:
+                    result['wordform'] = other_result[-1].strip()
+                except IndexError:
+                    pass
+                results.append(result)
+
+            info.append({header_tag.text: results})
+        return info
+
+    def phrasal_verbs(self):
+        return [{'name': self.required(link['xh']).text, 'id': WordPage.extract_id(link['tag'].attrs['href'])}
+                for link in self.phrasal_links]
+
+    def verb_forms(self):
         try:
-            for tag in cls.soup_data.select(selector):
-                tag.decompose()
+            result = {}
+            for row in self.verb_form_rows:
+                form = row['tag'].attrs['form']
+                value = self.required(row['td'])
+                span_tag = self.required(row['prefix'])
+                prefix = span_tag.text
+                span_tag.replace_with('')
+                result[form] = {'prefix': prefix, 'value': value.text.strip()}
+            return result
         except IndexError:
-            pass
+            return None
 
-    @classmethod
-    def __parse_word(cls, page_html):
-        """ save parsed html soup of word in cls.soup_data or raise WordNotFound if word is not found """
-        if page_html.status_code == 404:
-            raise WordNotFound
+    def info(self):
+        """ the same dict as WordPage.info_by_selectors(), which remains the reference implementation """
+        word = {
+            'id': self.required(self.entry).attrs['id'],
+            'name': self.name(),
+            'wordform': self.text(self.pos),
+            'pronunciations': self.pronunciations(),
+            'property': self.text(self.grammar),
+            'definitions': self.definition_full(),
+            'idioms': self.idiom_list(),
+            'other_results': self.other_results()
+        }
 
-        cls.soup_data = soup(page_html.content, 'html.parser')
+        if not word['property']:
+            word.pop('property', None)
 
-        """ check if "No exact ..." message exists """
-        no_exact = cls.soup_data.select_one('#search-results > h1')
-        if no_exact is not None and no_exact.string.startswith('No exact match found'):
-            raise WordNotFound
+        if not word['other_results']:
+            word.pop('other_results', None)
 
-    @classmethod
-    def get(cls, word, headers, is_search):
-        """ get html soup of word """
-        req = requests.Session()
-        req.cookies.set_policy(BlockAll())
+        if word['wordform'] == 'verb':
+            word['phrasal_verbs'] = self.phrasal_verbs()
+            word['verb_forms'] = self.verb_forms()
 
-        page_html = req.get(
-            cls.get_url(word, is_search),
-            headers=headers,
-            proxies=cls.PROXIES,
-        )
-        cls.__parse_word(page_html)
+        return word
 
-        if cls.soup_data is not None:
-            # remove some unnecessary tags to prevent false positive results
-            cls.delete('[title="Oxford Collocations Dictionary"]')
-            cls.delete('[title="British/American"]')  # edge case: 'phone'
-            cls.delete('[title="Express Yourself"]')
-            cls.delete('[title="Collocations"]')
-            cls.delete('[title="Word Origin"]')
 
-    @classmethod
-    def fetch_audio(cls, audio_url, headers, timeout=5):
-        """ download audio content for pronunciations """
-        req = requests.Session()
-        req.cookies.set_policy(BlockAll())
-        response = req.get(audio_url, timeout=timeout, headers=headers, proxies=cls.PROXIES)
-        return response.content
+class WordPage(object):
+    """ parsed dictionary page of a single lookup, owns its html soup """
+    # compiled once and called directly, e.g. self.title_selector.select(tag): the bs4 bundled with
+    # Anki before 4.12 can't take a compiled selector in Tag.select()
+    entry_selector = soupsieve.compile('#entryContent > .entry')
+    header_selector = soupsieve.compile('.top-container')
+
+    title_selector = soupsieve.compile('.top-container .headword')
+    wordform_selector = soupsieve.compile('.top-container .pos')
+    property_global_selector = soupsieve.compile('.top-container .grammar')
+
+    verb_forms_selector = soupsieve.compile('tr.verb_form[form]')
+    verb_forms_selector_td = soupsieve.compile('td.verb_form')
+    br_pronounce_selector = soupsieve.compile('[geo=br] .phon')
+    am_pronounce_selector = soupsieve.compile('[geo=n_am] .phon')
+    br_pronounce_audio_ogg_selector = soupsieve.compile('[geo=br] [data-src-ogg]')
+    am_pronounce_audio_ogg_selector = soupsieve.compile('[geo=n_am] [data-src-ogg]')
+    br_pronounce_audio_mp3_selector = soupsieve.compile('[geo=br] [data-src-mp3]')
+    am_pronounce_audio_mp3_selector = soupsieve.compile('[geo=n_am] [data-src-mp3]')
+
+    definition_body_selector = soupsieve.compile('.senses_multiple')
+    definition_body_selector_single = soupsieve.compile('.sense_single')
+    namespaces_selector = soupsieve.compile('.senses_multiple > .shcut-g')
+    examples_selector = soupsieve.compile('.senses_multiple .sense > .examples .x')
+    definitions_selector = soupsieve.compile('.senses_multiple .sense > .def')
+
+    extra_examples_selector = soupsieve.compile('.res-g [title="Extra examples"] .x-gs .x')
+    phrasal_verbs_selector = soupsieve.compile('.phrasal_verb_links a')
+    idioms_selector = soupsieve.compile('.idioms > .idm-g')
+
+    # '#rightcolumn #relatedentries' on the full page, #rightcolumn itself is not kept by PageSoup
+    other_results_selector = soupsieve.compile('#relatedentries')
+
+    def __init__(self, soup_data):
+        self.soup_data = soup_data
+
+    def delete(self, selector):
+        """ remove tag with specified selector in self.soup_data """
+        try:
+            for tag in self.soup_data.select(selector):
+                tag.decompose()
+        except IndexError:
+            pass
 
-    @classmethod
-    def verb_forms(cls):
+    def verb_forms(self):
         """ return verb forms for irregular verbs """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
         try:
             result = {}
-            for verb_form in cls.soup_data.select(cls.verb_forms_selector):
+            for verb_form in self.verb_forms_selector.select(self.soup_data):
                 form = verb_form.attrs['form']
 
-                value = verb_form.select(cls.verb_forms_selector_td)[0]
+                value = self.verb_forms_selector_td.select(verb_form)[0]
 
                 span_tag = value.select('span.vf_prefix')[0]
                 prefix = span_tag.text
@@ -172,8 +880,7 @@ class Word(object):
         except IndexError:
             return None
 
-    @classmethod
-    def other_results(cls):
+    def other_results(self):
         """ get similar words, idioms, phrases...
 
         Return: {
@@ -193,7 +900,7 @@ class Word(object):
         info = []
 
         try:
-            rightcolumn_tags = cls.soup_data.select(cls.other_results_selector)[0]
+            rightcolumn_tags = self.other_results_selector.select(self.soup_data)[0]
         except IndexError:
             return None
 
@@ -213,7 +920,7 @@ class Word(object):
                 other_results.append(names)
 
             other_results = list(filter(None, other_results))  # remove empty list
-            ids = [cls.extract_id(tag.attrs['href'])
+            ids = [self.extract_id(tag.attrs['href'])
                    for tag in other_results_tag.select('li a')]
 
             results = []
@@ -233,45 +940,41 @@ class Word(object):
 
         return info
 
-    @classmethod
-    def name(cls):
+    def name(self):
         """ get word name """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
-        name = cls.soup_data.select(cls.title_selector)[0]
+        name = self.title_selector.select(self.soup_data)[0]
         for span_tag in name.select('span'):
             span_tag.replace_with('')
         return name.text.strip()
 
-    @classmethod
-    def id(cls):
+    def id(self):
         """ get id of a word. if a word has definitions in 2 seperate pages
         (multiple wordform) it will return 'word_1' and 'word_2' depend on
         which page it's on """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
-        return cls.soup_data.select(cls.entry_selector)[0].attrs['id']
+        return self.entry_selector.select(self.soup_data)[0].attrs['id']
 
-    @classmethod
-    def wordform(cls):
+    def wordform(self):
         """ return wordform of word (verb, noun, adj...) """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
         try:
-            return cls.soup_data.select(cls.wordform_selector)[0].text
+            return self.wordform_selector.select(self.soup_data)[0].text
         except IndexError:
             return None
 
-    @classmethod
-    def property_global(cls):
+    def property_global(self):
         """ return global property (apply to all definitions) """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
         try:
-            return cls.soup_data.select(cls.property_global_selector)[0].text
+            return self.property_global_selector.select(self.soup_data)[0].text
         except IndexError:
             return None
 
@@ -286,18 +989,17 @@ class Word(object):
 
         return None
 
-    @classmethod
-    def pronunciations(cls):
+    def pronunciations(self):
         """ get britain and america pronunciations """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
         britain = {'prefix': None, 'ipa': None, 'ogg': None, 'mp3': None}
         america = {'prefix': None, 'ipa': None, 'ogg': None, 'mp3': None}
 
         try:
-            britain_pron_tag = cls.soup_data.select(cls.br_pronounce_selector)[0]
-            america_pron_tag = cls.soup_data.select(cls.am_pronounce_selector)[0]
+            britain_pron_tag = self.br_pronounce_selector.select(self.soup_data)[0]
+            america_pron_tag = self.am_pronounce_selector.select(self.soup_data)[0]
 
             britain['ipa'] = britain_pron_tag.text
             britain['prefix'] = 'BrE'
@@ -307,18 +1009,20 @@ class Word(object):
             pass
 
         try:
-            britain['ogg'] = cls.soup_data.select(cls.br_pronounce_audio_ogg_selector)[0].attrs['data-src-ogg']
-            america['ogg'] = cls.soup_data.select(cls.am_pronounce_audio_ogg_selector)[0].attrs['data-src-ogg']
-            britain['mp3'] = cls.soup_data.select(cls.br_pronounce_audio_mp3_selector)[0].attrs['data-src-mp3']
-            america['mp3'] = cls.soup_data.select(cls.am_pronounce_audio_mp3_selector)[0].attrs['data-src-mp3']
+            britain['ogg'] = self.br_pronounce_audio_ogg_selector.select(self.soup_data)[0].attrs['data-src-ogg']
+            america['ogg'] = self.am_pronounce_audio_ogg_selector.select(self.soup_data)[0].attrs['data-src-ogg']
+            britain['mp3'] = self.br_pronounce_audio_mp3_selector.select(self.soup_data)[0].attrs['data-src-mp3']
+            america['mp3'] = self.am_pronounce_audio_mp3_selector.select(self.soup_data)[0].attrs['data-src-mp3']
         except IndexError:
             pass
 
         if britain['prefix'] is None and (britain['ogg'] or britain['mp3']):
-            britain['prefix'] = cls.get_prefix_from_filename(britain['ogg']) or cls.get_prefix_from_filename(britain['mp3'])
+            britain['prefix'] = (self.get_prefix_from_filename(britain['ogg'])
+                                 or self.get_prefix_from_filename(britain['mp3']))
 
         if america['prefix'] is None and (america['ogg'] or america['mp3']):
-            america['prefix'] = cls.get_prefix_from_filename(america['ogg']) or cls.get_prefix_from_filename(america['mp3'])
+            america['prefix'] = (self.get_prefix_from_filename(america['ogg'])
+                                 or self.get_prefix_from_filename(america['mp3']))
 
         return [britain, america]
 
@@ -330,66 +1034,60 @@ class Word(object):
         """
         return link.split('/')[-1]
 
-    @classmethod
-    def get_references(cls, tags):
+    def get_references(self, tags):
         """ get info about references to other page
         Argument: soup.select(<selector>)
         Return: [{'id': <id>, 'name': <word>}, {'id': <id2>, 'name': <word2>}, ...]
         """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
         references = []
         for tag in tags.select('.xrefs a'):  # see also <external link>
-            id = cls.extract_id(tag.attrs['href'])
+            id = self.extract_id(tag.attrs['href'])
             word = tag.text
             references.append({'id': id, 'name': word})
 
         return references
 
-    @classmethod
-    def references(cls):
+    def references(self):
         """ get global references """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
-        header_tag = cls.soup_data.select(cls.header_selector)[0]
-        return cls.get_references(header_tag)
+        header_tag = self.header_selector.select(self.soup_data)[0]
+        return self.get_references(header_tag)
 
-    @classmethod
-    def definitions(cls, full=False):
+    def definitions(self, full=False):
         """ Return: list of definitions """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
         if not full:
-            return [tag.text for tag in cls.soup_data.select(cls.definitions_selector)]
-        return cls.definition_full()
+            return [tag.text for tag in self.definitions_selector.select(self.soup_data)]
+        return self.definition_full()
 
-    @classmethod
-    def examples(cls):
+    def examples(self):
         """ List of all examples (not categorized in seperate definitions) """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
-        return [tag.text for tag in cls.soup_data.select(cls.examples_selector)]
+        return [tag.text for tag in self.examples_selector.select(self.soup_data)]
 
-    @classmethod
-    def phrasal_verbs(cls):
+    def phrasal_verbs(self):
         """ get phrasal verbs list (verb only) """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
         phrasal_verbs = []
-        for tag in cls.soup_data.select(cls.phrasal_verbs_selector):
+        for tag in self.phrasal_verbs_selector.select(self.soup_data):
             phrasal_verb = tag.select('.xh')[0].text
-            id = cls.extract_id(tag.attrs['href'])  # https://abc/definition/id -> id
+            id = self.extract_id(tag.attrs['href'])  # https://abc/definition/id -> id
 
             phrasal_verbs.append({'name': phrasal_verb, 'id': id})
 
         return phrasal_verbs
 
-    @classmethod
-    def _parse_definition(cls, parent_tag):
+    def _parse_definition(self, parent_tag):
         """ return word definition + corresponding examples
 
         A word can have a single (None) or multiple namespaces
@@ -400,7 +1098,7 @@ class Word(object):
         (transitive/intransitive/countable/uncountable/singular/plural...)
         A verb can have phrasal verbs
         """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
         definition = {}
@@ -420,7 +1118,7 @@ class Word(object):
         except IndexError:
             pass
 
-        definition['references'] = cls.get_references(parent_tag)
+        definition['references'] = self.get_references(parent_tag)
         if not definition['references']:
             definition.pop('references', None)
 
@@ -439,8 +1137,7 @@ class Word(object):
 
         return definition
 
-    @classmethod
-    def definition_full(cls):
+    def definition_full(self):
         """ return word definition + corresponding examples
 
         A word can have a single (None) or multiple namespaces
@@ -451,10 +1148,10 @@ class Word(object):
         (transitive/intransitive/countable/uncountable/singular/plural...)
         A verb can have phrasal verbs
         """
-        if cls.soup_data is None:
+        if self.soup_data is None:
             return None
 
-        namespace_tags = cls.soup_data.select(cls.namespaces_selector)
+        namespace_tags = self.namespaces_selector.select(self.soup_data)
 
         info = []
         for namespace_tag in namespace_tags:
@@ -469,7 +1166,7 @@ class Word(object):
             definition_full_tags = namespace_tag.select('.sense')
 
             for definition_full_tag in definition_full_tags:
-                definition = cls._parse_definition(definition_full_tag)
+                definition = self._parse_definition(definition_full_tag)
                 definitions.append(definition)
 
             info.append({'namespace': namespace, 'definitions': definitions})
@@ -477,31 +1174,30 @@ class Word(object):
         # no namespace. all definitions is global
         if len(info) == 0:
             info.append({'namespace': '__GLOBAL__', 'definitions': []})
-            def_body_tags = cls.soup_data.select(cls.definition_body_selector)
+            def_body_tags = self.definition_body_selector.select(self.soup_data)
             if len(def_body_tags) == 0:
-                def_body_tags = cls.soup_data.select(cls.definition_body_selector_single)
+                def_body_tags = self.definition_body_selector_single.select(self.soup_data)
 
             definitions = []
             for def_body_tag in def_body_tags:
                 definition_full_tags = def_body_tag.select('.sense')
 
                 for definition_full_tag in definition_full_tags:
-                    definition = cls._parse_definition(definition_full_tag)
+                    definition = self._parse_definition(definition_full_tag)
                     definitions.append(definition)
 
             info[0]['definitions'] = definitions
 
         return info
 
-    @classmethod
-    def idioms(cls):
+    def idioms(self):
         """ get word idioms
 
         Idioms dont have namespace like regular definitions
         Each idioms have one or more definitions
         Each definitions can have one, many or no examples
         """
-        idiom_tags = cls.soup_data.select(cls.idioms_selector)
+        idiom_tags = self.idioms_selector.select(self.soup_data)
 
         idioms = []
         for idiom_tag in idiom_tags:
@@ -525,7 +1221,7 @@ class Word(object):
             except IndexError:
                 pass
 
-            global_definition['references'] = cls.get_references(idiom_tag)
+            global_definition['references'] = self.get_references(idiom_tag)
             if not global_definition['references']:
                 global_definition.pop('references', None)
 
@@ -549,7 +1245,7 @@ class Word(object):
                 except IndexError:
                     pass
 
-                definition['references'] = cls.get_references(definition_tag)
+                definition['references'] = self.get_references(definition_tag)
                 if not definition['references']:
                     definition.pop('references', None)
 
@@ -560,21 +1256,26 @@ class Word(object):
 
         return idioms
 
-    @classmethod
-    def info(cls):
-        """ return all info about a word """
-        if cls.soup_data is None:
+    def info(self):
+        """ return all info about a word, the page is walked only once """
+        if self.soup_data is None:
+            return None
+        return EntryScan(self.soup_data).info()
+
+    def info_by_selectors(self):
+        """ return all info about a word using the extractors above, slower than info() """
+        if self.soup_data is None:
             return None
 
         word = {
-            'id': cls.id(),
-            'name': cls.name(),
-            'wordform': cls.wordform(),
-            'pronunciations': cls.pronunciations(),
-            'property': cls.property_global(),
-            'definitions': cls.definitions(full=True),
-            'idioms': cls.idioms(),
-            'other_results': cls.other_results()
+            'id': self.id(),
+            'name': self.name(),
+            'wordform': self.wordform(),
+            'pronunciations': self.pronunciations(),
+            'property': self.property_global(),
+            'definitions': self.definitions(full=True),
+            'idioms': self.idioms(),
+            'other_results': self.other_results()
         }
 
         if not word['property']:
@@ -584,12 +1285,169 @@ class Word(object):
             word.pop('other_results', None)
 
         if word['wordform'] == 'verb':
-            word['phrasal_verbs'] = cls.phrasal_verbs()
-            word['verb_forms'] = cls.verb_forms()
+            word['phrasal_verbs'] = self.phrasal_verbs()
+            word['verb_forms'] = self.verb_forms()
 
         return word
 
 
+def parse_page(page_html, features='html.parser'):
+    """ return WordPage of downloaded html or raise WordNotFound if word is not found """
+    if page_html.status_code == 404:
+        raise WordNotFound
+    # an error page is not an answer about the word, it must not be taken or cached as "not found"
+    page_html.raise_for_status()
+
+    return parse_html(page_html.content, features, declared_encoding(page_html))
+
+
+def declared_encoding(response):
+    """ charset of the Content-Type header of response, None if the header does not declare one """
+    message = Message()
+    message['Content-Type'] = response.headers.get('Content-Type', '')
+    return message.get_content_charset()
+
+
+def parse_html(html, features='html.parser', encoding=None):
+    """ return WordPage of page html parsed by the bs4 builder features, see parsers.py
+
+    A known encoding is used as is, bs4 does not sniff the encoding from the page then.
+    """
+    page = WordPage(PageSoup(html, features, from_encoding=encoding))
+
+    """ check if "No exact ..." message exists """
+    no_exact = page.soup_data.select_one('#search-results > h1')
+    if no_exact is not None and no_exact.string.startswith('No exact match found'):
+        raise WordNotFound
+
+    return page
+
+
+def download_page(word, headers, is_search):
+    """ download a dictionary page, the response is parsed by parse_page() """
+    with recorder.span('page download'):
+        return Session.request(
+            Word.get_url(word, is_search),
+            headers=headers,
+            proxies=Word.PROXIES,
+        )
+
+
+def fetch_page(word, headers, is_search):
+    """ download and parse a dictionary page, every call returns its own WordPage """
+    return parse_page(download_page(word, headers, is_search))
+
+
+class Word(WordPage):
+    """ retrive word info from oxford dictionary website
+
+    Kept for compatibility: the last fetched page is stored on the class, so it must not be
+    used from several threads at once. Use fetch_page() and WordPage for concurrent lookups.
+    """
+
+    # remove proxy - disabled by default but may be added to config in future.
+    PROXIES = {
+        #todo do not push until commented back
+        #'http': 'http://127.0.0.1:8118',
+        #'https': 'http://127.0.0.1:8118',
+    }
+
+    # may point to a local server replaying recorded pages, see tests/stub_server.py
+    BASE_URL = 'https://www.oxfordlearnersdictionaries.com'
+
+    soup_data = None
+
+    @classmethod
+    def get_url(cls, word, is_search):
+        """ get url of word definition """
+        if is_search:
+            baseurl = cls.BASE_URL + '/search/english/?q='
+        else:
+            baseurl = cls.BASE_URL + '/definition/english/'
+        return baseurl + word
+
+    @classmethod
+    def get(cls, word, headers, is_search):
+        """ get html soup of word """
+        cls.soup_data = fetch_page(word, headers, is_search).soup_data
+
+    @classmethod
+    def fetch_audio(cls, audio_url, headers, timeout=5):
+        """ download audio content for pronunciations """
+        with recorder.span('audio download'):
+            response = Session.request(audio_url, headers=headers, proxies=cls.PROXIES, timeout=timeout)
+            return response.content
+
+    @classmethod
+    def page(cls):
+        """ WordPage over the soup saved by the last get() """
+        return WordPage(cls.soup_data)
+
+    @classmethod
+    def delete(cls, selector):
+        cls.page().delete(selector)
+
+    @classmethod
+    def verb_forms(cls):
+        return cls.page().verb_forms()
+
+    @classmethod
+    def other_results(cls):
+        return cls.page().other_results()
+
+    @classmethod
+    def name(cls):
+        return cls.page().name()
+
+    @classmethod
+    def id(cls):
+        return cls.page().id()
+
+    @classmethod
+    def wordform(cls):
+        return cls.page().wordform()
+
+    @classmethod
+    def property_global(cls):
+        return cls.page().property_global()
+
+    @classmethod
+    def pronunciations(cls):
+        return cls.page().pronunciations()
+
+    @classmethod
+    def get_references(cls, tags):
+        return cls.page().get_references(tags)
+
+    @classmethod
+    def references(cls):
+        return cls.page().references()
+
+    @classmethod
+    def definitions(cls, full=False):
+        return cls.page().definitions(full)
+
+    @classmethod
+    def examples(cls):
+        return cls.page().examples()
+
+    @classmethod
+    def phrasal_verbs(cls):
+        return cls.page().phrasal_verbs()
+
+    @classmethod
+    def definition_full(cls):
+        return cls.page().definition_full()
+
+    @classmethod
+    def idioms(cls):
+        return cls.page().idioms()
+
+    @classmethod
+    def info(cls):
+        return cls.page().info()
+
+
 [{
     'All matches': [{'name': 'content', 'id': 'content2_1', 'wordform': 'adjective'}, {'name': 'content', 'id': 'content2_2', 'wordform': 'verb'}, {'name': 'content', 'id': 'contentment', 'wordform': ''}, {'name': 'content farm', 'id': 'content-farm', 'wordform': 'noun'}, {'name': 'content mill', 'id': 'content-mill', 'wordform': 'noun'}, {'name': 'content word', 'id': 'content-word', 'wordform': 'noun'}, {'name': 'content marketing', 'id': 'content-marketing', 'wordform': 'noun'}, {'name': 'content provider', 'id': 'content-provider', 'wordform': 'noun'}, {'name': 'content management system', 'id': 'content-management-system', 'wordform': 'noun'}, {'name': 'content farms', 'id': 'content-farm', 'wordform': ''}, {'name': 'content mill', 'id': 'content-farm', 'wordform': ''}, {'name': 'content mills', 'id': 'content-mill', 'wordform': ''}, {'name': 'content farm', 'id': 'content-mill', 'wordform': ''}, {'name': 'content providers', 'id': 'content-provider', 'wordform': ''}, {'name': 'user-generated content', 'id': 'ugc', 'wordform': ''}, {'name': 'content management system', 'id': 'cms', 'wordform': ''}, {'name': 'to your heart’s content', 'id': 'content2_3#heart_idmg_50', 'wordform': ''}]}, {'Idioms': [{'name': 'to your heart’s content', 'id': 'content2_3#heart_idmg_50', 'wordform': ''}]}
  ]
@@ -0,0 +1,238 @@
+""" offline dictionary pack: extracted entries and audio files in one memory-mapped file
+
+usage: python -m AutoDefineAddon.pack WORDS_FILE PACK_FILE [--audio] [--workers N] [--config FILE]
+
+Looks up every word of WORDS_FILE like the add-on does and stores the Word.info() of every page
+it needed, and with --audio the pronunciation files, in PACK_FILE. Point the PACK_FILE option of
+the add-on to it and those words are defined without network.
+
+File layout, integers are little endian:
+    header  magic, entry count (u32), table offset (u64)
+    values  zlib-compressed JSON of Word.info() (null for "word not found") or audio file content
+    keys    utf-8 keys one after another
+    table   (key offset u64, key length u32, value offset u64, value length u32) per entry,
+            sorted by key so that a key is found with a binary search over the mapped file
+Pages and audio files are keyed by the path and query of their url, so a pack does not depend on
+the host it was built from.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+MAGIC = b'ADPACK01'
+HEADER = struct.Struct('<8sIQ')
+RECORD = struct.Struct('<QIQI')
+
+
+def url_key(url):
+    """ 'https://host/search/english/?q=run' -> '/search/english/?q=run' """
+    parts = urlsplit(url)
+    return parts.path + ('?' + parts.query if parts.query else '')
+
+
+class Pack(object):
+    """ read-only view of a pack file, safe to use from several threads """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.count, self.table_offset = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not an AutoDefine pack")
+            if self.table_offset + self.count * RECORD.size > len(self.map):
+                raise ValueError(f"{path} is truncated")
+        except (ValueError, struct.error):
+            self.map.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.map.close()
+
+    def find(self, key):
+        """ (offset, length) of the value stored under key, None if there is none """
+        key = key.encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, value_offset, value_length = RECORD.unpack_from(
+                self.map, self.table_offset + middle * RECORD.size)
+            found = self.map[key_offset:key_offset + key_length]
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                return value_offset, value_length
+        return None
+
+    def get(self, key):
+        location = self.find(key)
+        if location is None:
+            return None
+        offset, length = location
+        return self.map[offset:offset + length]
+
+    def get_page(self, url):
+        """ (found, Word.info() or None for "word not found") of the page at url """
+        value = self.get(url_key(url))
+        if value is None:
+            return False, None
+        return True, json.loads(zlib.decompress(value))
+
+    def get_audio(self, url):
+        """ content of the audio file at url, None if it is not in the pack """
+        return self.get(url_key(url))
+
+
+class PackWriter(object):
+    """ writes a pack, values go to disk as they are added and only the keys are kept in memory """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path + '.tmp', 'wb')
+        self.file.write(HEADER.pack(MAGIC, 0, 0))
+        self.values = {}
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.values
+
+    def add(self, key, value):
+        """ store value bytes under key, a key that is already stored keeps its first value """
+        with self.lock:
+            if key in self.values:
+                return
+            self.values[key] = (self.file.tell(), len(value))
+            self.file.write(value)
+
+    def add_page(self, url, word_info):
+        self.add(url_key(url), zlib.compress(json.dumps(word_info).encode('utf-8')))
+
+    def add_audio(self, url, content):
+        self.add(url_key(url), content)
+
+    def close(self):
+        with self.lock:
+            keys = sorted((key.encode('utf-8'), value) for key, value in self.values.items())
+            records = []
+            for key, (value_offset, value_length) in keys:
+                records.append(RECORD.pack(self.file.tell(), len(key), value_offset, value_length))
+                self.file.write(key)
+            table_offset = self.file.tell()
+            self.file.write(b''.join(records))
+            self.file.seek(0)
+            self.file.write(HEADER.pack(MAGIC, len(records), table_offset))
+            self.file.close()
+            os.replace(self.path + '.tmp', self.path)
+
+
+def open_pack(path, base_dir, report):
+    """ Pack at path, relative to base_dir, or None when no pack is configured or it cannot be read
+
+    Why a configured pack is not used is passed to report().
+    """
+    if not path:
+        return None
+    path = os.path.join(base_dir, path)
+    if not os.path.exists(path):
+        report(f"pack {path} not found")
+        return None
+    try:
+        return Pack(path)
+    except (OSError, ValueError, struct.error) as ex:
+        # an empty file cannot be mapped, a short one has no header
+        report(f"pack {path} cannot be read: {ex}")
+        return None
+
+
+class RecordingCache(object):
+    """ info_cache stand-in that stores every page the pipeline looks up in a pack, cache is still used """
+
+    def __init__(self, writer, cache):
+        self.writer = writer
+        self.cache = cache
+
+    def get(self, url):
+        if self.cache is None:
+            return False, None
+        found, word_info = self.cache.get(url)
+        if found:
+            self.writer.add_page(url, word_info)
+        return found, word_info
+
+    def put(self, url, word_info):
+        self.writer.add_page(url, word_info)
+        if self.cache is not None:
+            self.cache.put(url, word_info)
+
+
+def pack_word(pipeline, writer, word, audio):
+    """ look up word, its pages are stored by RecordingCache, return whether it was found """
+    words_info = pipeline.get_words_info(word)
+    if audio:
+        for _, audio_url in pipeline.get_audio_files(pipeline.get_audio_dict(words_info)):
+            if url_key(audio_url) not in writer:
+                writer.add_audio(audio_url, pipeline.fetch_audio(audio_url))
+    return len(words_info) > 0
+
+
+def build(pipeline, words, path, audio=False, workers=1):
+    """ write the pack of words, return the number of words found """
+    writer = PackWriter(path)
+    cache = pipeline.info_cache
+    pipeline.info_cache = RecordingCache(writer, cache)
+    # the pack being built is filled from the cache and the network, not from another pack
+    pack, pipeline.pack = pipeline.pack, None
+    try:
+        with pipeline.page_lookups.batch(), ThreadPoolExecutor(max_workers=workers) as executor:
+            found = sum(executor.map(lambda word: pack_word(pipeline, writer, word, audio), words))
+    finally:
+        pipeline.info_cache = cache
+        pipeline.pack = pack
+    writer.close()
+    return found
+
+
+def main(argv=None):
+    # the lookups are done by the pipeline that cli sets up
+    from . import cli
+    parser = argparse.ArgumentParser(prog='python -m AutoDefineAddon.pack', description=__doc__.splitlines()[0])
+    parser.add_argument('words', help='file with one word per line, - for stdin')
+    parser.add_argument('pack', help='pack file to write')
+    parser.add_argument('--audio', action='store_true', help='also store the pronunciation files')
+    parser.add_argument('--workers', type=int, default=None, help='parallel lookups (default BULK_WORKERS)')
+    parser.add_argument('--config', help='JSON file overriding sections of config.json')
+    parser.add_argument('--no-cache', action='store_true', help='do not use user_files/cache.sqlite3')
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    cli.load_pipeline(os.path.abspath(args.config) if args.config else None, not args.no_cache, args.base_url)
+    cli.print_reports()
+    words = cli.read_words(args.words)
+    start = time.perf_counter()
+    found = build(cli.pipeline, words, args.pack, args.audio, args.workers or cli.pipeline.BULK_WORKERS)
+    pack = Pack(args.pack)
+    entries = len(pack)
+    pack.close()
+    print(f"{found} of {len(words)} words found, {entries} entries, "
+          f"{os.path.getsize(args.pack) / 1e6:.1f} MB in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return 0 if found else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
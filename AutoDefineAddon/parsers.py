@@ -0,0 +1,191 @@
+""" choice of the bs4 tree builder that parses dictionary pages
+
+html.parser is always available and is the reference. With PARSER set to "auto" the first
+CONFORMANCE_PAGES pages downloaded are saved into a conformance set, every installed builder
+parses them and the clearly fastest one whose Word.info() is identical for every page is used
+from then on, see probe(). The decision and its numbers are saved next to the pages and reused
+until bs4, lxml or the extracted data change. Only the Anki process collects pages and decides,
+the command line tools pin() the choice to the saved decision.
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from bs4 import __version__ as bs4_version
+from bs4.builder import builder_registry
+
+from .media import write_atomic
+
+REFERENCE = 'html.parser'
+# html5lib is left out, it does not support parse_only
+CANDIDATES = ('lxml', 'html.parser')
+CONFORMANCE_PAGES = 5
+# another builder has to parse this much faster than REFERENCE to be worth using
+MIN_SPEEDUP = 0.1
+
+
+def available_parsers():
+    """ features of the candidate builders that can be used here """
+    return [features for features in CANDIDATES if builder_registry.lookup(features) is not None]
+
+
+def parser_versions(data_version):
+    """ what a decision depends on """
+    versions = {'bs4': bs4_version, 'data': data_version}
+    try:
+        from lxml import etree
+        versions['lxml'] = etree.__version__
+    except ImportError:
+        pass
+    return versions
+
+
+def probe(pages, extract, parsers=None, repeat=5):
+    """ parse pages with every builder, return {'parser': fastest conforming one, 'clear': bool, 'parsers': numbers}
+
+    extract(html, features) returns the data that has to be identical to the one of REFERENCE.
+    Every builder gets an untimed warm-up pass, which also checks that it conforms, then the
+    conforming ones take turns parsing all pages repeat times and the best pass counts. The
+    fastest other builder is chosen only when it is more than MIN_SPEEDUP faster than REFERENCE and
+    beyond the noise, the spread between the best and the median pass. 'clear' is False when the
+    difference is within that noise, the numbers then say nothing about which one is faster.
+    """
+    parsers = parsers or available_parsers()
+    if REFERENCE not in parsers:
+        parsers = [REFERENCE] + list(parsers)
+    expected = [extract(html, REFERENCE) for html in pages]
+    results = {}
+    for features in parsers:
+        conforms = True
+        for html, reference in zip(pages, expected):
+            try:
+                conforms &= extract(html, features) == reference
+            except Exception:
+                conforms = False
+        results[features] = {'conforms': conforms}
+
+    conforming = [features for features in parsers if results[features]['conforms']]
+    elapsed = {features: [] for features in conforming}
+    for _ in range(repeat):
+        # in turns, a busy moment of the machine then slows all of them down
+        for features in conforming:
+            start = time.perf_counter()
+            for html in pages:
+                extract(html, features)
+            elapsed[features].append(time.perf_counter() - start)
+    for features in conforming:
+        times = sorted(elapsed[features])
+        results[features]['ms_per_page'] = times[0] * 1000 / len(pages)
+        results[features]['noise'] = times[len(times) // 2] / times[0] - 1
+
+    others = [features for features in conforming if features != REFERENCE]
+    if not others:
+        return {'parser': REFERENCE, 'clear': True, 'parsers': results}
+    fastest = min(others, key=lambda features: results[features]['ms_per_page'])
+    reference_ms, fastest_ms = results[REFERENCE]['ms_per_page'], results[fastest]['ms_per_page']
+    noise = max(results[REFERENCE]['noise'], results[fastest]['noise'])
+    parser = fastest if reference_ms / fastest_ms - 1 > max(MIN_SPEEDUP, noise) else REFERENCE
+    clear = max(reference_ms, fastest_ms) / min(reference_ms, fastest_ms) - 1 > noise
+    return {'parser': parser, 'clear': clear, 'parsers': results}
+
+
+class ParserChoice(object):
+    """ features passed to PageSoup, see the module docstring """
+
+    def __init__(self, setting, directory, extract, data_version, report):
+        self.directory = directory
+        self.extract = extract
+        self.report = report
+        self.versions = parser_versions(data_version)
+        self.lock = threading.Lock()
+        self.features = REFERENCE
+        self.decided = True
+        self.deciding = False
+        if setting != 'auto':
+            if setting in available_parsers():
+                self.features = setting
+            else:
+                report(f"parser {setting} is not available, {REFERENCE} is used")
+            return
+
+        decision = self.load_decision()
+        if decision is not None and decision['parser'] in available_parsers():
+            self.features = decision['parser']
+        else:
+            # pages saved by an earlier session may be enough, the decision is then made on the next download
+            self.decided = False
+
+    @property
+    def decision_path(self):
+        return os.path.join(self.directory, 'parser.json')
+
+    def page_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, 'page_*.html.gz')))
+
+    def load_decision(self):
+        try:
+            with open(self.decision_path, encoding='utf-8') as f:
+                decision = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return decision if decision.get('versions') == self.versions else None
+
+    def pin(self):
+        """ keep the current features, nothing is collected or decided from now on """
+        with self.lock:
+            self.decided = True
+
+    def page_downloaded(self, html):
+        """ add a downloaded page to the conformance set, decide in the background once it is complete """
+        if self.decided:
+            return
+        with self.lock:
+            if self.decided or self.deciding:
+                return
+            if len(self.page_paths()) < CONFORMANCE_PAGES:
+                # named by content, the same page is saved once
+                name = 'page_%s.html.gz' % hashlib.sha1(html).hexdigest()[:16]
+                try:
+                    os.makedirs(self.directory, exist_ok=True)
+                    write_atomic(os.path.join(self.directory, name), gzip.compress(html))
+                except OSError as ex:
+                    self.decided = True
+                    self.report(f"pages for choosing the parser could not be saved, {REFERENCE} is used: {ex}")
+                    return
+            if len(self.page_paths()) >= CONFORMANCE_PAGES:
+                self.start_deciding()
+
+    def start_deciding(self):
+        """ parsing the conformance set takes about a second, lookups keep using REFERENCE meanwhile """
+        self.deciding = True
+        threading.Thread(target=self.decide, daemon=True).start()
+
+    def decide(self):
+        """ probe the conformance set, the numbers are saved with the decision
+
+        When that fails REFERENCE is kept for the rest of the session and the next one decides again.
+        """
+        try:
+            paths = self.page_paths()[:CONFORMANCE_PAGES]
+            pages = []
+            for path in paths:
+                with gzip.open(path, 'rb') as f:
+                    pages.append(f.read())
+            decision = probe(pages, self.extract)
+            if not decision['clear']:
+                # e.g. the machine was busy, the next session measures again
+                return
+            decision['versions'] = self.versions
+            decision['pages'] = len(pages)
+            write_atomic(self.decision_path, json.dumps(decision, indent=2).encode('utf-8'))
+            self.features = decision['parser']
+        except Exception as ex:
+            self.report(f"the parser could not be chosen, {REFERENCE} is used: {type(ex).__name__}: {ex}")
+        finally:
+            self.decided = True
+            self.deciding = False
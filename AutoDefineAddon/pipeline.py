@@ -0,0 +1,521 @@
+# AutoDefine Oxford Learner's Dictionaries Anki Add-on
+# Copyright (c) Artem Petrov    apsapetrov@gmail.com
+# https://github.com/artyompetrov/AutoDefine_oxfordlearnersdictionaries Licensed under GPL v2
+
+""" dictionary lookup and rendering of definitions, phonetics and audio
+
+Nothing here imports aqt, so the same pipeline runs inside Anki and without it.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from .oxford import Word, WordNotFound, Session, download_page, parse_page, parse_html
+from .cache import InfoCache, LookupMemo, USER_FILES_DIR, CACHE_VERSION
+from .media import AudioDownloader
+from .pack import open_pack
+from .parsers import ParserChoice
+from . import render
+from .nltk_loader import load_nltk
+from .timing import recorder
+
+
+def load_config():
+    """ add-on config from Anki, or the defaults from config.json when Anki is not running
+
+    Outside of Anki the sections of the JSON file named by AUTODEFINE_CONFIG override the defaults.
+    """
+    mw = getattr(sys.modules.get('aqt'), 'mw', None)
+    if mw is not None:
+        if getattr(mw.addonManager, "getConfig", None):
+            return mw.addonManager.getConfig(__name__)
+        return None
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json'), encoding='utf-8') as f:
+        config = json.load(f)
+    if os.environ.get('AUTODEFINE_CONFIG'):
+        with open(os.environ['AUTODEFINE_CONFIG'], encoding='utf-8') as f:
+            for section_name, section in json.load(f).items():
+                config.setdefault(section_name, {}).update(section)
+    return config
+
+
+CONFIG = load_config()
+
+
+def get_config_value(section_name, param_name, default):
+    value = default
+    if CONFIG is not None:
+        if section_name in CONFIG:
+            section = CONFIG[section_name]
+            if param_name in section:
+                value = section[param_name]
+    return value
+
+
+# sections whose options change what is written into a note, the others (timing, prefetch, bulk,
+# cache, network, ...) do not
+NOTE_CONTENT_SECTIONS = ('1. word', '2. definition', '3. audio and phonetics', '4. verb forms')
+NOTE_CONTENT_OPTIONS = {'1. word': (' 1. SOURCE_FIELD', ' 2. CLEAN_HTML_IN_SOURCE_FIELD')}
+
+
+def config_fingerprint():
+    """ hash of the options that change note contents, results of runs with the same fingerprint are interchangeable """
+    options = {}
+    for section_name in NOTE_CONTENT_SECTIONS:
+        section = (CONFIG or {}).get(section_name, {})
+        names = NOTE_CONTENT_OPTIONS.get(section_name, section.keys())
+        options[section_name] = {name: section.get(name) for name in names}
+    return hashlib.sha1(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+AUDIO_FORMAT = "mp3"
+
+section = '0. general'
+TIMING = get_config_value(section, " 2. TIMING", False)
+PARSER = get_config_value(section, " 3. PARSER", "auto")
+
+section = '2. definition'
+REPLACE_BY = get_config_value(section, " 3. REPLACE_BY", "#$#")
+MAX_EXAMPLES_COUNT_PER_DEFINITION = get_config_value(section, " 4. MAX_EXAMPLES_COUNT_PER_DEFINITION", 2)
+MAX_DEFINITIONS_COUNT_PER_PART_OF_SPEECH = get_config_value(section, " 5. MAX_DEFINITIONS_COUNT_PER_PART_OF_SPEECH", 3)
+
+section = '3. audio and phonetics'
+CORPUS = get_config_value(section, " 1. CORPUS", "American")
+
+section = '7. bulk'
+BULK_WORKERS = max(1, int(get_config_value(section, " 1. BULK_WORKERS", 8)))
+
+section = '8. cache'
+CACHE = get_config_value(section, " 1. CACHE", True)
+CACHE_TTL_DAYS = get_config_value(section, " 2. CACHE_TTL_DAYS", 30)
+CACHE_MAX_SIZE_MB = get_config_value(section, " 3. CACHE_MAX_SIZE_MB", 100)
+PACK_FILE = get_config_value(section, " 4. PACK_FILE", "")
+
+section = '9. network'
+CONNECTION_POOL_SIZE = get_config_value(section, " 1. CONNECTION_POOL_SIZE", 10)
+RETRIES = get_config_value(section, " 2. RETRIES", 3)
+TIMEOUT_SECONDS = get_config_value(section, " 3. TIMEOUT_SECONDS", 15)
+MAX_REQUESTS_PER_SECOND = get_config_value(section, " 4. MAX_REQUESTS_PER_SECOND", 20)
+
+if CORPUS.lower() == 'british':
+    CORPUS_TAGS_PRIORITIZED = ['BrE']
+elif CORPUS.lower() == 'american':
+    CORPUS_TAGS_PRIORITIZED = ['nAmE']
+elif CORPUS.lower() == 'british_first':
+    CORPUS_TAGS_PRIORITIZED = ['BrE', 'nAmE']
+elif CORPUS.lower() == 'american_first':
+    CORPUS_TAGS_PRIORITIZED = ['nAmE', 'BrE']
+else:
+    raise Exception("Unknown CORPUS " + CORPUS)
+
+
+PorterStemmer, tokinize = load_nltk()
+ps = PorterStemmer()
+
+unify = ps.stem
+
+# distinct tokens whose stems are kept, a bulk run of thousands of words needs far fewer
+STEM_CACHE_SIZE = 100000
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/118.0.0.0 Safari/537.36'
+}
+
+Session.configure(pool_size=max(CONNECTION_POOL_SIZE, BULK_WORKERS), retries=RETRIES,
+                  timeout=(min(5, TIMEOUT_SECONDS), TIMEOUT_SECONDS),
+                  max_requests_per_second=MAX_REQUESTS_PER_SECOND)
+
+recorder.enabled = bool(TIMING)
+
+audio_downloader = AudioDownloader(lambda audio_url: fetch_audio(audio_url),
+                                   workers=BULK_WORKERS)
+
+# page lookups kept in memory during a bulk run, pages beyond that come from info_cache
+LOOKUP_MEMO_SIZE = 1000
+
+page_lookups = LookupMemo(LOOKUP_MEMO_SIZE)
+
+# "word not found" is cached for a short time only, the page may be missing temporarily
+NOT_FOUND_TTL_SECONDS = 60 * 60
+
+# the sqlite file is created by the first lookup, a run without the cache sets info_cache to None
+info_cache = None
+if CACHE:
+    info_cache = InfoCache(os.path.join(USER_FILES_DIR, 'cache.sqlite3'),
+                           ttl_seconds=CACHE_TTL_DAYS * 24 * 60 * 60,
+                           max_size_bytes=CACHE_MAX_SIZE_MB * 1024 * 1024,
+                           negative_ttl_seconds=NOT_FOUND_TTL_SECONDS)
+
+# problems that leave the add-on working without a feature, shown by autodefine.py and printed by cli.py
+reports = []
+# called after each report, e.g. autodefine.py shows the ones made while Anki is already open
+report_listeners = []
+
+
+def report(message):
+    reports.append(message)
+    for listener in report_listeners:
+        listener()
+
+
+# offline pages and audio files, looked at before info_cache and the network, see pack.py
+pack = open_pack(PACK_FILE, USER_FILES_DIR, report)
+
+
+def extract_page_info(html, features):
+    """ Word.info() of page html parsed by the bs4 builder features, None if the word is not found """
+    try:
+        return parse_html(html, features).info()
+    except WordNotFound:
+        return None
+
+
+# bs4 builder of dictionary pages, see parsers.py
+parser_choice = ParserChoice(PARSER, os.path.join(USER_FILES_DIR, 'conformance'), extract_page_info,
+                             CACHE_VERSION, report)
+
+
+def nltk_token_spans(txt):
+    tokens = tokinize(txt)
+    offset = 0
+    for token in tokens:
+        offset = txt.find(token, offset)
+        next_offset = offset + len(token)
+        yield token, offset, next_offset
+        assert token == txt[offset:next_offset]
+        offset = next_offset
+
+
+@recorder.timed('replace')
+def replace_word_in_sentence(words_to_replace_lists, sentence, highlight):
+    """ wrap the tokens of sentence matching one of the stem sequences in REPLACE_BY
+
+    Runs of whitespace between tokens are kept as that many spaces. Where several sequences
+    match at the same token the longest one is replaced.
+    """
+    trie = token_trie(frozenset(words_to_replace_lists))
+    spans = list(nltk_token_spans(sentence))
+    stems = [stem(token) for token, _, _ in spans]
+
+    replaced_anything = False
+    parts = []
+    previous_stop = 0
+    position = 0
+    while position < len(spans):
+        length = match_length(trie, stems, position)
+        for token, start, stop in spans[position:position + max(length, 1)]:
+            parts.append(' ' * (start - previous_stop))
+            parts.append(REPLACE_BY.replace("$", token) if length else token)
+            previous_stop = stop
+        replaced_anything |= length > 0
+        position += max(length, 1)
+    result = ''.join(parts)
+
+    if not replaced_anything and highlight:
+        result = '<font color="red">Word_not_replaced</font> ' + result
+
+    return replaced_anything, result
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(token):
+    """ unify(token.lower()), the same words are stemmed over and over in bulk runs """
+    return unify(str.lower(token))
+
+
+@lru_cache(maxsize=256)
+def token_trie(words_to_replace_lists):
+    """ nested dicts of stems, a None key marks the end of a sequence """
+    trie = {}
+    for words_to_replace in words_to_replace_lists:
+        node = trie
+        for word_to_replace in words_to_replace:
+            node = node.setdefault(word_to_replace, {})
+        node[None] = True
+    return trie
+
+
+def match_length(trie, stems, position):
+    """ length of the longest sequence in trie matching stems from position on, 0 for no match """
+    length = 0
+    node = trie
+    for index in range(position, len(stems)):
+        node = node.get(stems[index])
+        if node is None:
+            break
+        if None in node:
+            length = index - position + 1
+    return length
+
+
+def get_verb_forms(words_info):
+    forms = []
+    for word_info in words_info:
+        verb_forms = word_info.get("verb_forms")
+        if verb_forms is not None:
+            thirdps = verb_forms.get("thirdps")
+            if thirdps is not None:
+                forms.append(thirdps.get('value'))
+
+            past = verb_forms.get("past")
+            if past is not None:
+                forms.append(past.get('value'))
+
+            pastpart = verb_forms.get("pastpart")
+            if pastpart is not None:
+                forms.append(pastpart.get('value'))
+
+            prespart = verb_forms.get("prespart")
+            if prespart is not None:
+                forms.append(prespart.get('value'))
+    return forms
+
+
+def entry_url(word_info):
+    """ url of the entry page of word_info, a search for the word shows the same page """
+    return Word.get_url(word_info['id'], is_search=False)
+
+
+def get_page_info(word, is_search):
+    """ Word.info() of a dictionary page, shared by page_lookups with other lookups of the same entry """
+    url = Word.get_url(word, is_search)
+    word_info = page_lookups.get(url, lambda: load_page_info(url, word, is_search))
+    if word_info is None:
+        raise WordNotFound
+    if is_search:
+        # get_words_info() looks up the entry of the search again among the matches
+        page_lookups.add(entry_url(word_info), word_info)
+    return word_info
+
+
+def load_page_info(url, word, is_search):
+    """ Word.info() of a dictionary page or None if the word is not found
+
+    The page is taken from pack or info_cache when possible.
+    """
+    if pack is not None:
+        found, word_info = pack.get_page(url)
+        if found:
+            recorder.count('pack hits')
+            return word_info
+
+    if info_cache is not None:
+        found, word_info = info_cache.get(url)
+        if found:
+            recorder.count('cache hits')
+            return word_info
+        recorder.count('cache misses')
+
+    try:
+        response = download_page(word, HEADERS, is_search)
+        with recorder.span('parse'):
+            page = parse_page(response, parser_choice.features)
+        with recorder.span('extract'):
+            word_info = page.info()
+        parser_choice.page_downloaded(response.content)
+    except WordNotFound:
+        word_info = None
+
+    if info_cache is not None:
+        info_cache.put(url, word_info)
+        if is_search and word_info is not None:
+            info_cache.put(entry_url(word_info), word_info)
+    return word_info
+
+
+def fetch_audio(audio_url):
+    if pack is not None:
+        content = pack.get_audio(audio_url)
+        if content is not None:
+            return content
+    return Word.fetch_audio(audio_url, HEADERS, timeout=5)
+
+
+def get_words_info(request_word):
+    words_info = []
+    word_to_search = request_word.replace(" ", "-").lower()
+    # the pages of one word are shared even when no bulk run is open
+    with page_lookups.batch():
+        try:
+            word_info = get_page_info(word_to_search, is_search=True)
+            words_info.append(word_info)
+            word_name = word_info['name'].lower()
+            other_results = word_info.get('other_results')
+            if other_results is not None:
+                for other_result in other_results:
+                    all_matches = other_result.get('All matches')
+                    if all_matches is not None:
+                        for match in all_matches:
+                            if word_name == match['name'].strip().lower():
+                                try:
+                                    word_info = get_page_info(match['id'], is_search=False)
+                                    if word_info['name'].lower() == word_name:
+                                        # verb forms are taken from the searched entry only
+                                        if word_info.get('verb_forms') is not None:
+                                            word_info = dict(word_info, verb_forms=None)
+                                        words_info.append(word_info)
+                                except WordNotFound:
+                                    pass
+
+        except WordNotFound:
+            pass
+    return words_info
+
+
+def get_word_name(word_infos):
+    for word_info in word_infos:
+        return word_info["name"]
+
+
+@recorder.timed('render')
+def get_definition_html(word_infos, verb_forms):
+    blocks = []
+
+    need_word_not_replaced_tag = False
+    for word_info in word_infos:
+        definitions_by_namespaces = word_info["definitions"]
+
+        definitions = []
+        for definition_by_namespace in definitions_by_namespaces:
+            for definition in definition_by_namespace["definitions"]:
+                definitions.append(definition)
+
+        if len(definitions) == 0:
+            continue
+
+        word = word_info["name"]
+        wordform = word_info.get("wordform")
+        if wordform is not None:
+            blocks.append(('i', wordform))
+
+        if MAX_DEFINITIONS_COUNT_PER_PART_OF_SPEECH is not False:
+            definitions = definitions[0:MAX_DEFINITIONS_COUNT_PER_PART_OF_SPEECH]
+
+        words_to_replace = [word]
+        for verb_form in verb_forms:
+            words_to_replace.append(verb_form)
+        words_to_replace_lists = frozenset([tuple([stem(word) for word in tokinize(words)])
+                                            for words in words_to_replace])
+
+        previous_definition_without_examples = False
+        for definition in definitions:
+            maybe_description = definition.get("description")
+            if maybe_description is not None:
+                (_, description) = replace_word_in_sentence(words_to_replace_lists, maybe_description, False)
+                if previous_definition_without_examples:
+                    blocks.append(('br', None))
+                blocks.append(('div', description))
+
+            examples = definition.get("examples", []) + definition.get("extra_example", [])
+
+            if MAX_EXAMPLES_COUNT_PER_DEFINITION is not False:
+                examples = examples[0:MAX_EXAMPLES_COUNT_PER_DEFINITION]
+
+            if len(examples) > 0:
+                examples_html = []
+                for example in examples:
+                    example = example.replace('/', ' / ')
+                    (replaced_anything, example_clean) = replace_word_in_sentence(words_to_replace_lists, example, True)
+
+                    need_word_not_replaced_tag |= not replaced_anything
+                    examples_html.append(example_clean)
+                blocks.append(('ul', examples_html))
+                previous_definition_without_examples = False
+            else:
+                previous_definition_without_examples = True
+
+        blocks.append(('hr', None))
+
+    if len(blocks) > 0:
+        del blocks[-1]
+
+    if render.can_render(blocks):
+        return render.render(blocks), need_word_not_replaced_tag
+    recorder.count('prettified definitions')
+    with recorder.span('prettify'):
+        return render.prettify(blocks), need_word_not_replaced_tag
+
+
+def get_phonetics(word_infos):
+    phonetics_dict = {}
+    for word_info in word_infos:
+        wordform = word_info.get("wordform")
+        if wordform is None:
+            wordform = "none"
+        pronunciations = word_info.get("pronunciations")
+        fill_phonetics_dict_prioritized(phonetics_dict, pronunciations, wordform)
+
+    if len(phonetics_dict) == 0:
+        return "<span class=\"do_not_show\">No phonetics found</span>"
+    elif len(phonetics_dict) == 1:
+        return '[' + next(iter(phonetics_dict)) + ']'
+    else:
+        return "<br/>".join(["[" + key + '] - ' + ", ".join(phonetics_dict[key]) for key in iter(phonetics_dict)])
+
+
+def fill_phonetics_dict_prioritized(phonetics_dict, pronunciations, wordform):
+    for corpus_tag in CORPUS_TAGS_PRIORITIZED:
+        for pronunciation in pronunciations:
+            if corpus_tag == pronunciation["prefix"]:
+                phonetics = pronunciation["ipa"].replace('/', "")
+
+                value = phonetics_dict.get(phonetics, None)
+                if value is not None:
+                    value.append(wordform)
+                else:
+                    phonetics_dict[phonetics] = [wordform]
+
+
+@recorder.timed('audio')
+def get_audio(word_infos, media_path):
+    """ [sound:...] markup for the pronunciations, missing files are downloaded into media_path """
+    audio_dict = get_audio_dict(word_infos)
+    audio_downloader.download(media_path, get_audio_files(audio_dict))
+
+    if len(audio_dict) == 0:
+        return "<span class=\"do_not_show\">No audio found</span>"
+    elif len(audio_dict) == 1:
+        return f'[sound:{audio_dict[next(iter(audio_dict))]["audio_name"]}]'
+    else:
+        return "<br/>".join(["[sound:" + audio_dict[key]['audio_name'] + '] - ' +
+                             ", ".join(audio_dict[key]['wordform']) for key in iter(audio_dict)])
+
+
+def get_audio_dict(word_infos):
+    audio_dict = {}
+    for word_info in word_infos:
+        wordform = word_info.get("wordform")
+        if wordform is None:
+            wordform = "none"
+        pronunciations = word_info.get("pronunciations")
+        fill_audio_dict_prioritized(audio_dict, pronunciations, wordform)
+    return audio_dict
+
+
+def get_audio_files(audio_dict):
+    return [(value['audio_name'], value['audio_url']) for value in audio_dict.values()]
+
+
+def fill_audio_dict_prioritized(audio_dict, pronunciations, wordform):
+    for corpus_tag in CORPUS_TAGS_PRIORITIZED:
+        for pronunciation in pronunciations:
+            if corpus_tag == pronunciation["prefix"]:
+                audio_url = pronunciation["mp3"] if AUDIO_FORMAT.lower() == "mp3" else pronunciation["ogg"]
+
+                audio_name = audio_url.split('/')[-1]
+
+                value = audio_dict.get(audio_name, None)
+                if value is not None:
+                    value['wordform'].append(wordform)
+                else:
+                    audio_dict[audio_name] = {'wordform': [wordform], "audio_name": audio_name,
+                                              "audio_url": audio_url}
+                return
+
+
+def clean_html(raw_html):
+    return re.sub(re.compile('<.*?>'), '', raw_html).replace("&nbsp;", " ")
@@ -0,0 +1,98 @@
+""" definition html written the way BeautifulSoup(html, 'html.parser').prettify() writes it
+
+get_definition_html() describes a definition as blocks, tuples (kind, value):
+    ('i', wordform text)
+    ('br', None)
+    ('div', description html)
+    ('ul', [example html, ...])
+    ('hr', None)
+render() writes them with the templates below, which follow the rules of Tag.decode(): every tag
+and text on its own line indented one space per level, text stripped, '&' and '>' escaped, and
+no newline after the last tag. Text with '<' or with a '&' that may start an entity has to be
+interpreted by a parser, e.g. a REPLACE_BY with tags, such blocks are still parsed and prettified.
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+WORD_NOT_REPLACED = '<font color="red">Word_not_replaced</font> '
+
+VOID_BLOCKS = {'br': '<br/>\n', 'hr': '<hr/>\n'}
+ITALIC = '<i>\n{}</i>'
+DESCRIPTION = '<div>\n <b>\n{} </b>\n</div>'
+EXAMPLES = '<ul>\n{}\n</ul>'
+EXAMPLE = ' <li>\n{} </li>'
+WORD_NOT_REPLACED_LINES = '  <font color="red">\n   Word_not_replaced\n  </font>\n'
+
+# a '&' followed by anything else is text for html.parser
+MARKUP = re.compile('<|&[A-Za-z#]')
+
+
+def markup(blocks):
+    """ the html of blocks without indentation """
+    strings = []
+    for kind, value in blocks:
+        if kind in VOID_BLOCKS:
+            strings.append('<%s/>' % kind)
+        elif kind == 'i':
+            strings.append('<i>' + value + '</i>')
+        elif kind == 'div':
+            strings.append('<div><b>' + value + '</b></div>')
+        else:
+            strings.append('<ul>' + ''.join('<li>' + example + '</li>' for example in value) + '</ul>')
+    return ''.join(strings)
+
+
+def prettify(blocks):
+    return BeautifulSoup(markup(blocks), 'html.parser').prettify()
+
+
+def needs_parser(text):
+    return MARKUP.search(text) is not None
+
+
+def text_line(text, indent):
+    """ a text node as prettify() writes it, nothing for whitespace """
+    text = text.strip()
+    return indent + text.replace('&', '&amp;').replace('>', '&gt;') + '\n' if text else ''
+
+
+def example_lines(example):
+    if example.startswith(WORD_NOT_REPLACED):
+        return WORD_NOT_REPLACED_LINES + text_line(example[len(WORD_NOT_REPLACED):], '  ')
+    return text_line(example, '  ')
+
+
+def can_render(blocks):
+    """ whether render() writes blocks exactly like prettify() """
+    for kind, value in blocks:
+        if kind == 'ul':
+            for example in value:
+                if example.startswith(WORD_NOT_REPLACED):
+                    example = example[len(WORD_NOT_REPLACED):]
+                if needs_parser(example):
+                    return False
+        elif value is not None and needs_parser(value):
+            return False
+    return True
+
+
+def render(blocks):
+    """ prettify(blocks) without parsing, if can_render(blocks) """
+    strings = []
+    for kind, value in blocks:
+        if kind in VOID_BLOCKS:
+            strings.append(VOID_BLOCKS[kind])
+            continue
+        if kind == 'i':
+            strings.append(ITALIC.format(text_line(value, ' ')))
+        elif kind == 'div':
+            strings.append(DESCRIPTION.format(text_line(value, '  ')))
+        else:
+            strings.append(EXAMPLES.format('\n'.join(EXAMPLE.format(example_lines(example)) for example in value)))
+        # a closed tag is followed by a newline only when something comes after it
+        strings.append('\n')
+    if strings and strings[-1] == '\n':
+        del strings[-1]
+    return ''.join(strings)
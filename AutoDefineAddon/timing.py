@@ -0,0 +1,136 @@
+""" optional timing of the stages of a define
+
+Spans measure how long a stage takes, counters count events. While the recorder is disabled
+nothing is recorded and span() returns a shared context manager that does nothing.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+NO_SPAN = nullcontext()
+
+
+def percentile(values, percent):
+    """ nearest-rank percentile of a non-empty list """
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * percent // 100) - 1)]
+
+
+class Span(object):
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.add(self.name, self.start, time.perf_counter() - self.start)
+
+
+class Recorder(object):
+    """ durations of spans and counter values since the last reset()
+
+    Every span is also kept as a trace event, up to max_events of them, for dump_chrome_trace().
+    """
+
+    def __init__(self, enabled=False, max_events=100000):
+        self.enabled = enabled
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.origin = time.perf_counter()
+            self.durations = defaultdict(list)
+            self.counters = defaultdict(int)
+            self.events = []
+
+    def span(self, name):
+        """ context manager timing the stage `name` """
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name)
+
+    def timed(self, name):
+        """ decorator timing every call of the function as the span `name` """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += value
+
+    def add(self, name, start, duration):
+        with self.lock:
+            self.durations[name].append(duration)
+            if len(self.events) < self.max_events:
+                self.events.append((name, start, duration, threading.get_ident()))
+
+    def summary(self):
+        """ {'spans': {name: count, total and p50/p95/max in ms}, 'counters': {name: value}} """
+        with self.lock:
+            durations = {name: list(values) for name, values in self.durations.items() if values}
+            counters = dict(self.counters)
+        spans = {}
+        for name, values in durations.items():
+            spans[name] = {
+                'count': len(values),
+                'total_ms': sum(values) * 1000,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'max_ms': max(values) * 1000,
+            }
+        return {'spans': spans, 'counters': counters}
+
+    def report(self):
+        """ summary() as a plain text table, slowest stages first """
+        summary = self.summary()
+        lines = ['%-20s %7s %10s %9s %9s %9s' % ('stage', 'count', 'total ms', 'p50 ms', 'p95 ms', 'max ms')]
+        for name, stats in sorted(summary['spans'].items(), key=lambda item: -item[1]['total_ms']):
+            lines.append('%-20s %7d %10.1f %9.2f %9.2f %9.2f' % (
+                name, stats['count'], stats['total_ms'], stats['p50_ms'], stats['p95_ms'], stats['max_ms']))
+        for name, value in sorted(summary['counters'].items()):
+            lines.append('%-20s %7d' % (name, value))
+        return '\n'.join(lines)
+
+    def dump_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def dump_chrome_trace(self, path):
+        """ write the spans in the Trace Event Format of chrome://tracing and ui.perfetto.dev """
+        with self.lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+            origin = self.origin
+        pid = os.getpid()
+        trace = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                  'ts': (start - origin) * 1e6, 'dur': duration * 1e6}
+                 for name, start, duration, tid in events]
+        if counters:
+            end = max([(start - origin + duration) * 1e6 for _, start, duration, _ in events] + [0])
+            trace.append({'name': 'counters', 'ph': 'C', 'pid': pid, 'tid': 0, 'ts': end, 'args': counters})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+
+# the recorder used by the add-on, enabled by the TIMING option
+recorder = Recorder()
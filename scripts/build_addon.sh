@@ -22,6 +22,9 @@ cp -a "$ADDON_DIR/." "$WORKING_ADDON_DIR"
 # Remove Python cache folders inside the build copy.
 find "$WORKING_ADDON_DIR" -type d -name '__pycache__' -prune -exec rm -rf {} +
 
+# Remove user data (response cache etc.) created by the add-on at runtime.
+rm -rf "$WORKING_ADDON_DIR/user_files"
+
 # Remove meta.json generated by Anki in the build copy.
 if [[ -f "$WORKING_ADDON_DIR/meta.json" ]]; then
   rm "$WORKING_ADDON_DIR/meta.json"
@@ -0,0 +1,126 @@
+""" offline benchmark of the lookup pipeline on the recorded fixture corpus
+
+usage: python benchmark.py [--fixtures DIR] [--words N] [--workers N] [--latency SECONDS] [--json FILE]
+
+The words of test_data.txt are looked up with pipeline.get_words_info() against stub_server.py
+and rendered with get_definition_html(). Throughput and p50/p95 latency are reported separately for
+fetch (download_page), parse (BeautifulSoup, parse_page), extract (WordPage.info) and render.
+Record the corpus with record_fixtures.py first.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# the vendored bs4 is used when it is not installed
+sys.path.append(str(Path(__file__).parent.parent / 'AutoDefineAddon'))
+
+from AutoDefineAddon import oxford, pipeline  # noqa: E402
+import stub_server  # noqa: E402
+
+WORDS_FILE = Path(__file__).parent / 'test_data.txt'
+
+STAGES = ('fetch', 'parse', 'extract', 'render')
+
+
+def percentile(values, percent):
+    """ nearest-rank percentile of a non-empty list """
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * percent // 100) - 1)]
+
+
+class Timings(object):
+    """ durations in seconds of every call, grouped by stage """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = defaultdict(list)
+
+    def timed(self, stage, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                with self.lock:
+                    self.durations[stage].append(duration)
+        return wrapper
+
+    def report(self, words, elapsed):
+        result = {'words': words, 'seconds': elapsed, 'words_per_second': words / elapsed, 'stages': {}}
+        for stage in STAGES:
+            durations = self.durations[stage]
+            if durations:
+                result['stages'][stage] = {
+                    'calls': len(durations),
+                    'per_second': len(durations) / sum(durations),
+                    'p50_ms': percentile(durations, 50) * 1000,
+                    'p95_ms': percentile(durations, 95) * 1000,
+                }
+        return result
+
+
+def lookup(word):
+    words_info = pipeline.get_words_info(word)
+    return pipeline.get_definition_html(words_info, pipeline.get_verb_forms(words_info))
+
+
+def run(words, workers):
+    """ look up and render all words, return (Timings, elapsed seconds) """
+    timings = Timings()
+    pipeline.info_cache = None
+    pipeline.download_page = timings.timed('fetch', oxford.download_page)
+    pipeline.parse_page = timings.timed('parse', oxford.parse_page)
+    oxford.WordPage.info = timings.timed('extract', oxford.WordPage.info)
+    pipeline.get_definition_html = timings.timed('render', pipeline.get_definition_html)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lookup, words))
+    return timings, time.perf_counter() - start
+
+
+def print_report(result):
+    print('%d words in %.2f s, %.1f words/s' % (result['words'], result['seconds'], result['words_per_second']))
+    print('%-8s %7s %10s %9s %9s' % ('stage', 'calls', 'calls/s', 'p50 ms', 'p95 ms'))
+    for stage, stats in result['stages'].items():
+        print('%-8s %7d %10.1f %9.2f %9.2f' % (
+            stage, stats['calls'], stats['per_second'], stats['p50_ms'], stats['p95_ms']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', default=stub_server.FIXTURES_DIR)
+    parser.add_argument('--words', type=int, default=None, help='look up only the first N words')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    if not stub_server.has_fixtures(args.fixtures):
+        sys.exit('no recorded pages in %s, run record_fixtures.py first' % args.fixtures)
+
+    words = [line.strip() for line in open(WORDS_FILE, encoding='utf-8') if line.strip()][:args.words]
+    server = stub_server.start(args.fixtures, latency=args.latency)
+    oxford.Word.BASE_URL = server.url
+    try:
+        timings, elapsed = run(words, args.workers)
+    finally:
+        server.shutdown()
+
+    result = timings.report(len(words), elapsed)
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
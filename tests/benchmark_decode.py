@@ -0,0 +1,63 @@
+""" time bs4 takes to turn a downloaded page into text, with and without the encoding of the response
+
+usage: python benchmark_decode.py PAGES_DIR [SCALE]
+
+PAGES_DIR contains dictionary pages saved as *.html in utf-8. Every page is made SCALE times larger
+(default 10) by repeating its body, and is decoded by the html.parser builder as bs4 gets it from
+parse_page(): without an encoding, which sniffs it, and with the encoding of the Content-Type header.
+Both are also timed on the pages with their <meta charset> removed, where sniffing has to guess.
+"""
+
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# the vendored bs4 is used when it is not installed
+sys.path.append(str(Path(__file__).parent.parent / 'AutoDefineAddon'))
+
+from bs4.builder import HTMLParserTreeBuilder  # noqa: E402
+
+META_CHARSET = re.compile(rb'<meta[^>]*charset[^>]*>', re.IGNORECASE)
+
+
+def enlarge(html, scale):
+    head, _, body = html.partition(b'<body')
+    return head + (b'<body' + body) * scale
+
+
+def decode(html, encoding):
+    markup, original_encoding, _, _ = next(HTMLParserTreeBuilder().prepare_markup(html, encoding))
+    return markup, original_encoding
+
+
+def measure(pages, encoding, repeat=5):
+    """ best per-page time in ms """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            decode(html, encoding)
+        timings.append((time.perf_counter() - start) * 1000 / len(pages))
+    return min(timings)
+
+
+def main(pages_dir, scale=10):
+    pages = [enlarge(path.read_bytes(), scale) for path in sorted(Path(pages_dir).glob('*.html'))]
+    if not pages:
+        sys.exit('no *.html pages in %s' % pages_dir)
+    undeclared = [META_CHARSET.sub(b'', html) for html in pages]
+
+    print('pages: %d, %.0f KB/page' % (len(pages), statistics.mean(map(len, pages)) / 1024))
+    for name, variant in (('<meta charset>', pages), ('no declaration', undeclared)):
+        for html in variant:
+            if decode(html, None)[0] != decode(html, 'utf-8')[0]:
+                sys.exit('different text for a page with %s' % name)
+        sniffed, known = measure(variant, None), measure(variant, 'utf-8')
+        print('%-15s sniffed %8.3f ms/page  known %8.3f ms/page  %.1fx' % (name, sniffed, known, sniffed / known))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *map(int, sys.argv[2:3]))
@@ -0,0 +1,100 @@
+""" collection side cost of refreshing Anki after a single word define
+
+usage: python benchmark_editor_refresh.py [NOTES] [DEFINES]
+
+Creates a temporary collection with NOTES notes (default 100000) spread over decks and tags and
+defines DEFINES random notes (default 50) twice. The first pass does what mw.reset() makes the
+main window do: it fires operation_did_execute with every change flag set. The deck list or
+overview is rebuilt, the study counts are recalculated, the browser sidebar reloads decks, note
+types and tags, and the visible browser rows are redrawn. The second pass does what
+autodefine.save_note() does: it fires only the OpChanges of the note update, so only the visible
+browser rows are redrawn. Qt rendering is not included, the real difference is larger.
+Needs the anki package (pip install anki).
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from anki.collection import AddNoteRequest, Collection
+
+DECKS = 20
+TAGS = 50
+VISIBLE_ROWS = 30
+DEFINITION = '<div>\n <b>\n  a #word# used in an example\n </b>\n</div>\n' * 20
+
+
+def create_collection(path, notes_count):
+    col = Collection(str(path))
+    notetype = col.models.by_name('Basic')
+    deck_ids = [col.decks.id('Words::Level %d' % number) for number in range(DECKS)]
+    requests = []
+    for number in range(notes_count):
+        note = col.new_note(notetype)
+        note['Front'] = 'word%d' % number
+        note.tags = ['tag%d' % (number % TAGS)]
+        requests.append(AddNoteRequest(note, deck_ids[number % DECKS]))
+    col.add_notes(requests)
+    return col
+
+
+def redraw_browser_rows(col, card_ids):
+    for card_id in card_ids:
+        col.browser_row_for_id(card_id)
+
+
+def refresh_after_reset(col, card_ids):
+    col.sched.deck_due_tree()
+    col.sched.counts()
+    col.decks.all_names_and_ids()
+    col.models.all_names_and_ids()
+    col.tags.tree()
+    redraw_browser_rows(col, card_ids)
+
+
+def define(col, nid, run):
+    note = col.get_note(nid)
+    note['Back'] = '%s%d' % (DEFINITION, run)
+    col.update_note(note, skip_undo_entry=True)
+
+
+def measure(name, nids, refresh):
+    start = time.perf_counter()
+    for run, nid in enumerate(nids):
+        refresh(nid, run)
+    elapsed = time.perf_counter() - start
+    print('%-20s %7.2f ms per define' % (name, elapsed * 1000 / len(nids)))
+    return elapsed
+
+
+def main(notes_count=100000, defines=50):
+    with tempfile.TemporaryDirectory() as directory:
+        col = create_collection(Path(directory) / 'collection.anki2', notes_count)
+        try:
+            nids = random.Random(0).sample(list(col.find_notes('')), defines)
+            card_ids = col.find_cards('', order=True)[:VISIBLE_ROWS]
+            # the browser sets its columns when it opens
+            col.set_browser_card_columns(col.load_browser_card_columns())
+            print('%d notes, %d decks, %d tags' % (notes_count, DECKS, TAGS))
+            # warm up the caches of the backend
+            refresh_after_reset(col, card_ids)
+
+            def with_reset(nid, run):
+                define(col, nid, run)
+                refresh_after_reset(col, card_ids)
+
+            def targeted(nid, run):
+                define(col, nid, run)
+                redraw_browser_rows(col, card_ids)
+
+            before = measure('mw.reset()', nids, with_reset)
+            after = measure('save_note()', nids, targeted)
+            print('speedup: %.1fx' % (before / after))
+        finally:
+            col.close()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
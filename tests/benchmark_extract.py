@@ -0,0 +1,65 @@
+""" compare WordPage.info() with the selector based WordPage.info_by_selectors() on saved pages
+
+usage: python benchmark_extract.py PAGES_DIR [REPEAT]
+
+PAGES_DIR contains dictionary pages saved as *.html. Both extractors must return the same dict
+for every page, the script prints the per-page extraction time of each of them.
+"""
+
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# the vendored bs4 is used when it is not installed
+sys.path.append(str(Path(__file__).parent.parent / 'AutoDefineAddon'))
+
+from AutoDefineAddon import oxford  # noqa: E402
+
+
+def outcome(extract):
+    try:
+        return json.dumps(extract(), sort_keys=True)
+    except Exception as ex:
+        return 'error: %s' % type(ex).__name__
+
+
+def measure(html, method, repeat):
+    """ best of `repeat` timings in ms, every run extracts from a freshly parsed page """
+    timings = []
+    for _ in range(repeat):
+        page = oxford.WordPage(oxford.PageSoup(html))
+        start = time.perf_counter()
+        outcome(getattr(page, method))
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main(pages_dir, repeat=3):
+    pages = sorted(Path(pages_dir).glob('*.html'))
+    if not pages:
+        sys.exit('no *.html pages in %s' % pages_dir)
+
+    before, after, mismatches = [], [], []
+    for path in pages:
+        html = path.read_bytes()
+        if outcome(oxford.WordPage(oxford.PageSoup(html)).info) != \
+                outcome(oxford.WordPage(oxford.PageSoup(html)).info_by_selectors):
+            mismatches.append(path.name)
+        before.append(measure(html, 'info_by_selectors', repeat))
+        after.append(measure(html, 'info', repeat))
+
+    print('pages: %d' % len(pages))
+    for name, timings in (('info_by_selectors', before), ('info', after)):
+        print('%-18s mean %7.2f ms  median %7.2f ms  max %7.2f ms' % (
+            name, statistics.mean(timings), statistics.median(timings), max(timings)))
+    print('speedup: %.1fx' % (sum(before) / sum(after)))
+
+    if mismatches:
+        sys.exit('different output for: %s' % ', '.join(mismatches))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *map(int, sys.argv[2:3]))
@@ -0,0 +1,50 @@
+""" memory taken by the bs4 tree of parsed dictionary pages
+
+usage: python benchmark_memory.py PAGES_DIR [FEATURES]
+
+PAGES_DIR contains dictionary pages saved as *.html. Every page is parsed into the PageSoup the
+add-on builds and into a BeautifulSoup of the whole page, the script prints the bytes that stay
+allocated while the tree is alive, per page and per node.
+"""
+
+import gc
+import statistics
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# the vendored bs4 is used when it is not installed
+sys.path.append(str(Path(__file__).parent.parent / 'AutoDefineAddon'))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from AutoDefineAddon import oxford  # noqa: E402
+
+
+def measure(html, make_soup):
+    """ (bytes allocated by the tree, number of nodes in it) """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    soup = make_soup(html)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, sum(1 for _ in soup.descendants)
+
+
+def main(pages_dir, features='html.parser'):
+    pages = sorted(Path(pages_dir).glob('*.html'))
+    if not pages:
+        sys.exit('no *.html pages in %s' % pages_dir)
+
+    print('pages: %d, parser: %s' % (len(pages), features))
+    for name, make_soup in (('PageSoup', lambda html: oxford.PageSoup(html, features)),
+                            ('whole page', lambda html: BeautifulSoup(html, features))):
+        sizes, nodes = zip(*(measure(path.read_bytes(), make_soup) for path in pages))
+        print('%-10s %8.0f KB/page  %7.0f nodes/page  %5.0f bytes/node' % (
+            name, statistics.mean(sizes) / 1024, statistics.mean(nodes), sum(sizes) / sum(nodes)))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:3])
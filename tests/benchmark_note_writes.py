@@ -0,0 +1,81 @@
+""" per-note cost of writing bulk define results into a collection
+
+usage: python benchmark_note_writes.py [NOTES] [CHUNK_SIZE]
+
+Creates a temporary collection with NOTES notes (default 10000) and rewrites every note with
+definition sized fields twice: once with a write per note, as note.flush() in bulk define used to
+do, and once with col.update_notes() per CHUNK_SIZE notes (default 100), as autodefine.write_notes()
+does. The per-note write calls col.update_note(), which does what the deprecated flush() does
+without printing a deprecation warning on every call.
+Needs the anki package (pip install anki).
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from anki.collection import AddNoteRequest, Collection
+
+DEFINITION = '<div>\n <b>\n  a #word# used in an example\n </b>\n</div>\n<ul>\n <li>\n  example\n </li>\n</ul>\n' * 20
+
+
+def create_collection(path, notes_count):
+    col = Collection(str(path))
+    notetype = col.models.by_name('Basic')
+    deck_id = col.decks.id('Default')
+    requests = []
+    for number in range(notes_count):
+        note = col.new_note(notetype)
+        note['Front'] = 'word%d' % number
+        requests.append(AddNoteRequest(note, deck_id))
+    col.add_notes(requests)
+    return col
+
+
+def rewrite_per_note(col, nids, run):
+    for nid in nids:
+        note = col.get_note(nid)
+        note['Back'] = '%s%d' % (DEFINITION, run)
+        col.update_note(note, skip_undo_entry=True)
+
+
+def rewrite_in_chunks(col, nids, run, chunk_size):
+    chunk = []
+    for nid in nids:
+        note = col.get_note(nid)
+        note['Back'] = '%s%d' % (DEFINITION, run)
+        chunk.append(note)
+        if len(chunk) >= chunk_size:
+            col.update_notes(chunk, skip_undo_entry=True)
+            chunk = []
+    if chunk:
+        col.update_notes(chunk, skip_undo_entry=True)
+
+
+def measure(name, nids, rewrite):
+    start = time.perf_counter()
+    rewrite()
+    elapsed = time.perf_counter() - start
+    print('%-24s %7.2f s  %6.3f ms per note' % (name, elapsed, elapsed * 1000 / len(nids)))
+    return elapsed
+
+
+def main(notes_count=10000, chunk_size=100):
+    with tempfile.TemporaryDirectory() as directory:
+        col = create_collection(Path(directory) / 'collection.anki2', notes_count)
+        try:
+            nids = col.find_notes('')
+            print('%d notes' % len(nids))
+            # the first rewrite pays for growing the database, it is not measured
+            rewrite_in_chunks(col, nids, 0, chunk_size)
+            before = measure('write per note', nids, lambda: rewrite_per_note(col, nids, 1))
+            after = measure('update_notes() x %d' % chunk_size, nids,
+                            lambda: rewrite_in_chunks(col, nids, 2, chunk_size))
+            print('speedup: %.1fx' % (before / after))
+        finally:
+            col.close()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
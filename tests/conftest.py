@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+# the vendored bs4 is used when it is not installed
+sys.path.append(str(ROOT_DIR / 'AutoDefineAddon'))
@@ -0,0 +1,48 @@
+""" record the dictionary pages looked up for the words in test_data.txt
+
+usage: python record_fixtures.py [WORDS_FILE] [FIXTURES_DIR]
+
+Every page downloaded by pipeline.get_words_info() is stored gzip-compressed in FIXTURES_DIR,
+where stub_server.py replays it. Pages answered with an error status are not stored,
+the stub server answers them with 404 as well. Already recorded words are skipped.
+"""
+
+import gzip
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# the vendored bs4 is used when it is not installed
+sys.path.append(str(Path(__file__).parent.parent / 'AutoDefineAddon'))
+
+from AutoDefineAddon import pipeline  # noqa: E402
+from stub_server import FIXTURES_DIR, page_path  # noqa: E402
+
+WORDS_FILE = Path(__file__).parent / 'test_data.txt'
+
+
+def recording(download_page, fixtures_dir):
+    def download_and_save(word, headers, is_search):
+        response = download_page(word, headers, is_search)
+        if response.status_code == 200:
+            path = page_path(fixtures_dir, is_search, word)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(gzip.compress(response.content))
+        return response
+    return download_and_save
+
+
+def main(words_file=WORDS_FILE, fixtures_dir=FIXTURES_DIR):
+    words = [line.strip() for line in open(words_file, encoding='utf-8') if line.strip()]
+    pipeline.info_cache = None
+    pipeline.download_page = recording(pipeline.download_page, fixtures_dir)
+
+    for number, word in enumerate(words, 1):
+        if page_path(fixtures_dir, True, word.replace(" ", "-").lower()).exists():
+            continue
+        words_info = pipeline.get_words_info(word)
+        print('%d/%d %s: %d entries' % (number, len(words), word, len(words_info)))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:3])
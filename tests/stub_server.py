@@ -0,0 +1,97 @@
+""" local HTTP server replaying dictionary pages recorded by record_fixtures.py
+
+usage: python stub_server.py [--fixtures DIR] [--port PORT] [--latency SECONDS]
+
+Search pages are served at /search/english/?q=WORD and entry pages at /definition/english/ID,
+like on the website, pages that were not recorded are answered with 404.
+Point the add-on to the server with oxford.Word.BASE_URL = 'http://127.0.0.1:PORT'.
+"""
+
+import argparse
+import gzip
+import http.server
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlparse
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+def page_path(fixtures_dir, is_search, name):
+    """ file of a recorded page: search/WORD.html.gz or definition/ID.html.gz """
+    return Path(fixtures_dir) / ('search' if is_search else 'definition') / (quote(name, safe='') + '.html.gz')
+
+
+def has_fixtures(fixtures_dir=FIXTURES_DIR):
+    return any(Path(fixtures_dir).glob('search/*.html.gz'))
+
+
+class ReplayHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # set by start()
+    fixtures_dir = FIXTURES_DIR
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlparse(self.path)
+        path = None
+        if url.path == '/search/english/':
+            path = page_path(self.fixtures_dir, True, parse_qs(url.query).get('q', [''])[0])
+        elif url.path.startswith('/definition/english/'):
+            path = page_path(self.fixtures_dir, False, url.path[len('/definition/english/'):])
+
+        if path is None or not path.is_file():
+            self.send_page(404, b'<html><body><h1>404 Not Found</h1></body></html>', gzipped=False)
+        else:
+            self.send_page(200, path.read_bytes(), gzipped=True)
+
+    def send_page(self, status, body, gzipped):
+        # pages are stored compressed and sent as is to clients accepting gzip, like the website does
+        accepts_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped and not accepts_gzip:
+            body, gzipped = gzip.decompress(body), False
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start(fixtures_dir=FIXTURES_DIR, port=0, latency=0.0):
+    """ serve fixtures_dir from a background thread, return the server, its url is server.url """
+    handler = type('Handler', (ReplayHandler,), {'fixtures_dir': Path(fixtures_dir), 'latency': latency})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.url = 'http://127.0.0.1:%d' % server.server_port
+    threading.Thread(target=server.serve_forever, name='StubServer', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    args = parser.parse_args()
+
+    server = start(args.fixtures, args.port, args.latency)
+    print('replaying %s at %s' % (args.fixtures, server.url))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
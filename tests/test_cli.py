@@ -0,0 +1,39 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import stub_server
+
+ROOT_DIR = Path(__file__).parent.parent
+
+SCRIPT = """
+import sys
+from AutoDefineAddon import cli
+exit_code = cli.main(sys.argv[1:])
+assert 'aqt' not in sys.modules
+sys.exit(exit_code)
+"""
+
+
+def run_cli(*args):
+    return subprocess.run([sys.executable, '-c', SCRIPT, *map(str, args)], cwd=ROOT_DIR,
+                          capture_output=True, text=True)
+
+
+def test_cli_streams_a_record_per_word_without_aqt(tmp_path):
+    # nothing is recorded in tmp_path, so the stub server answers every page with 404
+    server = stub_server.start(tmp_path)
+    words = tmp_path / 'words.txt'
+    words.write_text('run\n\n  give   up \nxyzzy\n')
+    output = tmp_path / 'out.jsonl'
+    try:
+        process = run_cli(words, '--output', output, '--no-cache', '--base-url', server.url, '--workers', 2)
+    finally:
+        server.shutdown()
+
+    assert process.returncode == 1, process.stderr
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record['word'] for record in records] == ['run', 'give up', 'xyzzy']
+    assert all(record['error'] == 'Word not found in dictionary' for record in records)
+    assert '3 words' in process.stderr
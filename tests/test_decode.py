@@ -0,0 +1,30 @@
+import requests
+from bs4 import BeautifulSoup
+
+from AutoDefineAddon.oxford import declared_encoding
+
+PAGE = '<html><head><title>café</title></head><body><p>ˈrʌn</p></body></html>'
+
+
+def response(content_type):
+    page_html = requests.Response()
+    if content_type is not None:
+        page_html.headers['Content-Type'] = content_type
+    return page_html
+
+
+def test_encoding_comes_from_the_content_type_header_only():
+    assert declared_encoding(response('text/html; charset=UTF-8')) == 'utf-8'
+    assert declared_encoding(response('text/html')) is None
+    assert declared_encoding(response(None)) is None
+
+
+def test_known_encoding_gives_the_same_tree_as_sniffing():
+    for markup in (PAGE.encode('utf-8'), b'\xef\xbb\xbf' + PAGE.encode('utf-8')):
+        known = BeautifulSoup(markup, 'html.parser', from_encoding='UTF-8')
+        assert known.decode() == BeautifulSoup(markup, 'html.parser').decode()
+        assert known.original_encoding == 'utf-8'
+
+    # a wrong header is not trusted over the bytes
+    latin = BeautifulSoup(PAGE.encode('latin-1', 'replace'), 'html.parser', from_encoding='utf-8')
+    assert latin.original_encoding != 'utf-8'
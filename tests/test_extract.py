@@ -0,0 +1,86 @@
+import gzip
+from pathlib import Path
+
+import pytest
+import soupsieve
+from bs4.element import ResultSet, Tag
+
+from AutoDefineAddon.oxford import PageSoup, Word, WordPage
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+SITE = 'https://www.oxfordlearnersdictionaries.com/definition/english/'
+MEDIA = 'https://www.oxfordlearnersdictionaries.com/media/english/'
+
+# markup the fixture corpus does not have: sense groups, grammar, cross references, phrasal verbs,
+# collocation boxes, labels and a missing American pronunciation
+GROUPED_SENSES = (
+    '<html><body><div id="entryContent"><div class="entry" id="run_1"><div class="top-container"><div class="top-g">'
+    '<div class="webtop"><h1 class="headword">run</h1> <span class="pos">verb</span>'
+    '<span class="phonetics"><div class="phons_br" geo="br"><div class="sound audio_play_button pron-uk" '
+    'data-src-mp3="' + MEDIA + 'uk_pron/r/run/run__gb_1.mp3" '
+    'data-src-ogg="' + MEDIA + 'uk_pron_ogg/r/run/run__gb_1.ogg"></div>'
+    '<span class="phon">/rʌn/</span></div></span>'
+    '<span class="grammar">[intransitive, transitive]</span>'
+    '<span class="xrefs"><a href="' + SITE + 'run-up"><span class="xh">run up</span></a></span></div>'
+    '<table class="verb_forms_table"><tr class="verb_form" form="past"><td class="verb_form">'
+    '<span class="vf_prefix">past simple</span> ran</td></tr></table></div></div>'
+    '<ol class="senses_multiple"><span class="shcut-g"><h2 class="shcut">move fast</h2>'
+    '<li class="sense" id="run_sng_1"><span class="grammar">[intransitive]</span> '
+    '<span class="labels">(informal)</span><span class="dis-g">(of people)</span>'
+    '<span class="def">to move using your legs, going faster than when you walk</span>'
+    '<ul class="examples"><li><span class="x">Can you run as fast as Mike?</span></li></ul>'
+    '<span class="unbox" unbox="extra_examples"><span class="box_title">Extra Examples</span>'
+    '<ul class="examples"><li><span class="unx">She ran home.</span></li></ul></span>'
+    '<span class="xrefs"><span class="prefix">see also</span> <a href="' + SITE + 'run-about" class="Ref">'
+    '<span class="xh">run about</span></a></span>'
+    '<span class="collapse" title="Oxford Collocations Dictionary"><span class="x">run fast</span></span></li>'
+    '</span><span class="shcut-g"><h2 class="shcut">manage</h2>'
+    '<li class="sense"><span class="def">to be in charge of a business</span></li></span></ol>'
+    '<div class="phrasal_verb_links"><ul><li><a href="' + SITE + 'run-after"><span class="xh">run after</span></a></li>'
+    '</ul></div></div></div></body></html>'
+)
+NO_ENTRY = '<html><body><div id="main-container"><p>Page not available</p></div></body></html>'
+
+
+def stock_select(self, selector, namespaces=None, limit=None, **kwargs):
+    """ Tag.select() of bs4 before 4.12, which Anki may bundle instead of the vendored copy """
+    if namespaces is None:
+        namespaces = self._namespaces
+    if limit is None:
+        limit = 0
+    return ResultSet(None, soupsieve.select(selector, self, namespaces, limit, **kwargs))
+
+
+def recorded_pages():
+    return [gzip.decompress(path.read_bytes()) for path in sorted(FIXTURES_DIR.glob('*/*.html.gz'))]
+
+
+def extract(html, method):
+    # the extractors change the tree they read, each one gets its own
+    return getattr(WordPage(PageSoup(html)), method)()
+
+
+def test_corpus_is_committed():
+    assert len(recorded_pages()) > 0
+
+
+@pytest.mark.parametrize('html', recorded_pages() + [GROUPED_SENSES.encode('utf-8')])
+def test_info_is_what_the_selectors_extract(html):
+    assert extract(html, 'info') == extract(html, 'info_by_selectors')
+
+
+def test_extractors_fail_alike_without_an_entry():
+    with pytest.raises(Exception) as expected:
+        extract(NO_ENTRY, 'info_by_selectors')
+    with pytest.raises(expected.type):
+        extract(NO_ENTRY, 'info')
+
+
+def test_selectors_work_with_a_stock_bs4(monkeypatch):
+    # it refuses a compiled selector, they have to be called directly
+    monkeypatch.setattr(Tag, 'select', stock_select)
+    for html in recorded_pages()[:3] + [GROUPED_SENSES]:
+        assert extract(html, 'info_by_selectors') == extract(html, 'info')
+        monkeypatch.setattr(Word, 'soup_data', PageSoup(html))
+        assert Word.name()
+        Word.definitions()
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+
+from AutoDefineAddon import oxford, pipeline, render
+from AutoDefineAddon.cache import CACHE_VERSION
+from AutoDefineAddon.parsers import ParserChoice
+import stub_server
+
+pytestmark = pytest.mark.skipif(not stub_server.has_fixtures(),
+                                reason='fixture corpus is not recorded, run record_fixtures.py')
+
+with open(Path(__file__).parent / 'test_data.txt') as file:
+    words = [line.strip() for line in file if line.strip()]
+# record_fixtures.py records the words of test_data.txt that are missing in the corpus
+recorded_words = [word for word in words
+                  if stub_server.page_path(stub_server.FIXTURES_DIR, True, word.replace(' ', '-').lower()).exists()]
+
+
+@pytest.fixture(scope='module')
+def stub_site(tmp_path_factory):
+    server = stub_server.start()
+    base_url, info_cache, parser_choice = oxford.Word.BASE_URL, pipeline.info_cache, pipeline.parser_choice
+    oxford.Word.BASE_URL, pipeline.info_cache = server.url, None
+    # the conformance set of the downloaded pages is not saved into user_files
+    pipeline.parser_choice = ParserChoice(pipeline.PARSER, str(tmp_path_factory.mktemp('conformance')),
+                                          pipeline.extract_page_info, CACHE_VERSION, pipeline.report)
+    yield server
+    oxford.Word.BASE_URL, pipeline.info_cache, pipeline.parser_choice = base_url, info_cache, parser_choice
+    server.shutdown()
+
+
+@pytest.mark.parametrize('word', recorded_words)
+def test_recorded_word(stub_site, word, monkeypatch):
+    words_info = pipeline.get_words_info(word)
+    assert len(words_info) > 0
+
+    blocks = []
+    can_render = render.can_render
+    monkeypatch.setattr(render, 'can_render', lambda definition: blocks.append(definition) or can_render(definition))
+    definition_html, _ = pipeline.get_definition_html(words_info, pipeline.get_verb_forms(words_info))
+    assert len(definition_html) > 0
+    # the field is byte for byte what parsing and prettifying the definition gave
+    assert definition_html == render.prettify(blocks[0])
+    assert len(pipeline.get_phonetics(words_info)) > 0
+
+
+def test_entry_of_a_search_is_not_downloaded_again(stub_site, monkeypatch):
+    urls = []
+    download_page = pipeline.download_page
+    monkeypatch.setattr(pipeline, 'download_page',
+                        lambda word, headers, is_search: urls.append(oxford.Word.get_url(word, is_search))
+                        or download_page(word, headers, is_search))
+    words_info = pipeline.get_words_info('advance')
+    # the search shows advance_1, only advance_2 is downloaded from the matches
+    assert [word_info['id'] for word_info in words_info] == ['advance_1', 'advance_1', 'advance_2']
+    assert urls == [oxford.Word.get_url('advance', True), oxford.Word.get_url('advance_2', False)]
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ADDON_DIR = Path(__file__).parent.parent / 'AutoDefineAddon'
+
+# cumulative import time of everything nltk_loader.load_nltk() imports in a fresh interpreter
+IMPORT_TIME_BUDGET_MS = 100
+
+MARK = 'AUTODEFINE_IMPORT_MARK'
+
+SCRIPT = f"""
+import sys
+sys.path.insert(0, {str(ADDON_DIR)!r})
+import nltk_loader
+print({MARK!r}, file=sys.stderr)
+PorterStemmer, wordpunct_tokenize = nltk_loader.load_nltk()
+print({MARK!r}, file=sys.stderr)
+assert PorterStemmer().stem('running') == 'run'
+assert wordpunct_tokenize("it's") == ['it', "'", 's']
+print(' '.join(sorted(sys.modules)))
+"""
+
+
+def measure_load_nltk():
+    """ return (top level imports as [(name, cumulative microseconds)], loaded module names) """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', SCRIPT],
+                             capture_output=True, text=True, check=True)
+    imports = []
+    inside = False
+    for line in process.stderr.splitlines():
+        if line == MARK:
+            inside = not inside
+        elif inside and line.startswith('import time:'):
+            _, cumulative, name = line[len('import time:'):].split('|')
+            # nested imports are indented, only top level entries are summed
+            if not name.startswith('  '):
+                imports.append((name.strip(), int(cumulative)))
+    return imports, process.stdout.split()
+
+
+def test_load_nltk_imports_only_stemmer_and_tokenizer():
+    _, modules = measure_load_nltk()
+    for heavy in ('nltk.collocations', 'nltk.parse', 'nltk.sem', 'nltk.corpus', 'numpy', 'tkinter'):
+        assert heavy not in modules
+
+
+def test_load_nltk_import_time_budget():
+    # the best of three runs is compared so a busy machine does not fail the check
+    totals = []
+    for _ in range(3):
+        imports, _ = measure_load_nltk()
+        totals.append(sum(cumulative for _, cumulative in imports) / 1000)
+    assert min(totals) <= IMPORT_TIME_BUDGET_MS, \
+        'load_nltk() took %.1f ms of imports, budget is %d ms' % (min(totals), IMPORT_TIME_BUDGET_MS)
@@ -0,0 +1,24 @@
+from AutoDefineAddon import cache
+from AutoDefineAddon.cache import InfoCache
+
+
+def test_file_is_created_by_the_first_lookup(tmp_path):
+    path = tmp_path / 'user_files' / 'cache.sqlite3'
+    info_cache = InfoCache(str(path), ttl_seconds=60, max_size_bytes=1024 * 1024)
+    assert not path.parent.exists()
+    assert info_cache.get('url') == (False, None)
+    assert path.exists()
+
+
+def test_not_found_is_kept_for_a_short_time(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    info_cache = InfoCache(str(tmp_path / 'cache.sqlite3'), ttl_seconds=100, max_size_bytes=1024 * 1024,
+                           negative_ttl_seconds=10)
+    info_cache.put('found', {'name': 'run'})
+    info_cache.put('not found', None)
+    now[0] += 5
+    assert info_cache.get('not found') == (True, None)
+    now[0] += 10
+    assert info_cache.get('not found') == (False, None)
+    assert info_cache.get('found') == (True, {'name': 'run'})
@@ -0,0 +1,50 @@
+import copy
+
+from AutoDefineAddon import pipeline
+from AutoDefineAddon.journal import BulkJournal
+
+
+def test_interrupted_run_can_be_resumed(tmp_path):
+    journal = BulkJournal(str(tmp_path / 'user_files' / 'bulk_journal.jsonl'))
+    journal.start(4, 'config-a', resume=False)
+    journal.record(1, 'done', None, 'config-a')
+    journal.record(2, 'error', 'Word not found in dictionary', 'config-a')
+    journal.close()
+
+    # a crash while writing leaves half a line
+    with open(journal.path, 'a') as f:
+        f.write('{"nid": 3, "sta')
+
+    assert journal.completed('config-a') == {1}
+    assert journal.completed('config-b') == set()
+
+    journal.start(3, 'config-a', resume=True)
+    journal.record(3, 'done', None, 'config-a')
+    journal.close()
+    header, records = journal.read()
+    assert header['notes'] == 4
+    assert [record['nid'] for record in records] == [1, 2, 3]
+    assert journal.completed('config-a') == {1, 3}
+
+
+def test_completed_run_removes_journal(tmp_path):
+    journal = BulkJournal(str(tmp_path / 'bulk_journal.jsonl'))
+    journal.start(1, 'config', resume=False)
+    journal.record(1, 'done', None, 'config')
+    journal.finish()
+    assert journal.read() == (None, [])
+    assert journal.completed('config') == set()
+
+
+def test_fingerprint_changes_only_with_note_contents(monkeypatch):
+    config = copy.deepcopy(pipeline.CONFIG)
+    monkeypatch.setattr(pipeline, 'CONFIG', config)
+    fingerprint = pipeline.config_fingerprint()
+
+    config['0. general'][' 2. TIMING'] = True
+    config['1. word'][' 3. PREFETCH'] = True
+    config['7. bulk'][' 1. BULK_WORKERS'] = 2
+    assert pipeline.config_fingerprint() == fingerprint
+
+    config['2. definition'][' 4. MAX_EXAMPLES_COUNT_PER_DEFINITION'] = 5
+    assert pipeline.config_fingerprint() != fingerprint
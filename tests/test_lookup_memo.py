@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from AutoDefineAddon.cache import LookupMemo
+
+
+def counting_load(value, release=None):
+    calls = []
+
+    def load():
+        calls.append(1)
+        if release is not None:
+            release.wait(5)
+        return value
+    return load, calls
+
+
+def test_concurrent_lookups_run_once():
+    memo = LookupMemo(max_entries=10)
+    release = threading.Event()
+    load, calls = counting_load('info', release)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(memo.get, 'url', load) for _ in range(4)]
+        while memo.saved < 3:
+            time.sleep(0.001)
+        release.set()
+    assert [future.result() for future in futures] == ['info'] * 4
+    assert len(calls) == 1
+    assert memo.saved == 3
+
+
+def test_results_are_kept_only_during_batch():
+    memo = LookupMemo(max_entries=10)
+    load, calls = counting_load('info')
+    with memo.batch():
+        memo.get('url', load)
+        memo.get('url', load)
+    memo.get('url', load)
+    memo.get('url', load)
+    assert len(calls) == 3
+    assert memo.saved == 1
+
+
+def test_failed_lookups_are_not_kept():
+    memo = LookupMemo(max_entries=10)
+
+    def fail():
+        raise ConnectionError
+
+    with memo.batch():
+        with pytest.raises(ConnectionError):
+            memo.get('url', fail)
+        assert memo.get('url', lambda: 'info') == 'info'
+    assert memo.saved == 0
+
+
+def test_batch_keeps_least_recently_used_entries():
+    memo = LookupMemo(max_entries=2)
+    with memo.batch():
+        for url in ('a', 'b', 'a', 'c'):
+            memo.get(url, lambda: url)
+        assert list(memo.futures) == ['a', 'c']
+
+
+def test_added_results_are_kept_only_during_batch():
+    memo = LookupMemo(max_entries=10)
+    memo.add('entry', 'info')
+    assert memo.get('entry', lambda: 'loaded') == 'loaded'
+    with memo.batch():
+        memo.add('entry', 'info')
+        memo.add('entry', 'other')
+        assert memo.get('entry', lambda: 'loaded') == 'info'
+    assert memo.saved == 1
@@ -0,0 +1,63 @@
+import os
+import threading
+
+import pytest
+
+from AutoDefineAddon import media
+from AutoDefineAddon.media import AudioDownloader, write_atomic
+
+
+def test_files_in_the_media_folder_are_not_downloaded(tmp_path):
+    (tmp_path / 'run__us_1.mp3').write_bytes(b'old')
+    fetched = []
+    downloader = AudioDownloader(lambda url: fetched.append(url) or b'new', workers=2)
+    downloader.download(str(tmp_path), [('run__us_1.mp3', 'https://host/run__us_1.mp3'),
+                                        ('ran__us_1.mp3', 'https://host/ran__us_1.mp3')])
+    assert fetched == ['https://host/ran__us_1.mp3']
+    assert (tmp_path / 'run__us_1.mp3').read_bytes() == b'old'
+    assert (tmp_path / 'ran__us_1.mp3').read_bytes() == b'new'
+
+    # the index knows the downloaded file, it is not fetched again
+    downloader.download(str(tmp_path), [('ran__us_1.mp3', 'https://host/ran__us_1.mp3')])
+    assert len(fetched) == 1
+
+
+def test_concurrent_requests_share_one_download(tmp_path):
+    release = threading.Event()
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        release.wait(5)
+        return b'audio'
+
+    downloader = AudioDownloader(fetch, workers=4)
+    files = [('run__us_1.mp3', 'https://host/run__us_1.mp3')]
+    first = downloader.prefetch(str(tmp_path), files)
+    second = downloader.prefetch(str(tmp_path), files)
+    assert first == second
+    release.set()
+    first[0].result()
+    assert fetched == ['https://host/run__us_1.mp3']
+    assert downloader.in_flight == {}
+
+
+def test_failed_write_leaves_no_file_behind(tmp_path, monkeypatch):
+    path = tmp_path / 'run__us_1.mp3'
+    with pytest.raises(TypeError):
+        write_atomic(str(path), 'not bytes')
+    assert os.listdir(tmp_path) == []
+
+    def failing_replace(source, target):
+        raise OSError('disk full')
+    monkeypatch.setattr(media.os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        write_atomic(str(path), b'audio')
+    assert os.listdir(tmp_path) == []
+
+    # a download that fails the same way is raised, not added to the index
+    downloader = AudioDownloader(lambda url: b'audio', workers=1)
+    with pytest.raises(OSError):
+        downloader.download(str(tmp_path), [('run__us_1.mp3', 'https://host/run__us_1.mp3')])
+    assert os.listdir(tmp_path) == []
+    assert 'run__us_1.mp3' not in downloader.media_index(str(tmp_path))
@@ -0,0 +1,90 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import stub_server
+
+from AutoDefineAddon.pack import Pack, PackWriter, open_pack, url_key
+
+ROOT_DIR = Path(__file__).parent.parent
+BASE_URL = 'https://www.oxfordlearnersdictionaries.com'
+
+
+def test_pages_and_audio_round_trip(tmp_path):
+    path = str(tmp_path / 'words.adpack')
+    writer = PackWriter(path)
+    writer.add_page(BASE_URL + '/search/english/?q=run', {'name': 'run', 'id': 'run_1'})
+    writer.add_page(BASE_URL + '/search/english/?q=xyzzy', None)
+    writer.add_page(BASE_URL + '/definition/english/café', {'name': 'café'})
+    writer.add_audio(BASE_URL + '/media/english/us_pron/r/run/run__/run__us_1.mp3', b'ID3 audio')
+    writer.add_page(BASE_URL + '/search/english/?q=run', {'name': 'replaced'})
+    writer.close()
+
+    pack = Pack(path)
+    assert len(pack) == 4
+    assert pack.get_page('http://127.0.0.1:8000/search/english/?q=run') == (True, {'name': 'run', 'id': 'run_1'})
+    assert pack.get_page(BASE_URL + '/search/english/?q=xyzzy') == (True, None)
+    assert pack.get_page(BASE_URL + '/definition/english/café') == (True, {'name': 'café'})
+    assert pack.get_page(BASE_URL + '/search/english/?q=walk') == (False, None)
+    assert pack.get_audio(BASE_URL + '/media/english/us_pron/r/run/run__/run__us_1.mp3') == b'ID3 audio'
+    assert pack.get_audio(BASE_URL + '/media/english/us_pron/w/walk.mp3') is None
+    pack.close()
+
+
+def test_unreadable_packs_are_reported_and_not_used(tmp_path):
+    path = tmp_path / 'words.adpack'
+    writer = PackWriter(str(path))
+    writer.add_page(BASE_URL + '/search/english/?q=run', {'name': 'run'})
+    writer.close()
+    complete = path.read_bytes()
+
+    reports = []
+    assert open_pack('', str(tmp_path), reports.append) is None
+    assert open_pack('missing.adpack', str(tmp_path), reports.append) is None
+    for content in (b'', b'ADPACK', b'not a pack at all', complete[:-1]):
+        path.write_bytes(content)
+        assert open_pack('words.adpack', str(tmp_path), reports.append) is None
+    assert len(reports) == 5
+
+    path.write_bytes(complete)
+    pack = open_pack('words.adpack', str(tmp_path), reports.append)
+    assert pack.get_page(BASE_URL + '/search/english/?q=run') == (True, {'name': 'run'})
+    pack.close()
+
+
+def test_lookups_are_sub_millisecond(tmp_path):
+    path = str(tmp_path / 'words.adpack')
+    writer = PackWriter(path)
+    for number in range(50000):
+        writer.add_page('/definition/english/word%d_1' % number, {'name': 'word%d' % number, 'definitions': []})
+    writer.close()
+
+    pack = Pack(path)
+    start = time.perf_counter()
+    for number in range(0, 50000, 25):
+        assert pack.get_page('/definition/english/word%d_1' % number)[0]
+    assert (time.perf_counter() - start) / 2000 < 0.001
+    pack.close()
+
+
+def test_pack_is_built_from_lookups_without_aqt(tmp_path):
+    # nothing is recorded in tmp_path, so the stub server answers every page with 404
+    server = stub_server.start(tmp_path)
+    words = tmp_path / 'words.txt'
+    words.write_text('run\nxyzzy\n')
+    path = tmp_path / 'words.adpack'
+    script = 'import sys; from AutoDefineAddon import pack; code = pack.main(sys.argv[1:]); ' \
+             'assert "aqt" not in sys.modules; sys.exit(code)'
+    try:
+        process = subprocess.run([sys.executable, '-c', script, str(words), str(path), '--no-cache',
+                                  '--base-url', server.url], cwd=ROOT_DIR, capture_output=True, text=True)
+    finally:
+        server.shutdown()
+
+    assert process.returncode == 1, process.stderr
+    assert '0 of 2 words found, 2 entries' in process.stderr
+    pack = Pack(str(path))
+    assert pack.get_page(server.url + '/search/english/?q=xyzzy') == (True, None)
+    assert url_key(server.url + '/search/english/?q=run') == '/search/english/?q=run'
+    pack.close()
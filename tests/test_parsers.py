@@ -0,0 +1,129 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bs4 import BeautifulSoup
+from AutoDefineAddon import parsers
+from AutoDefineAddon.parsers import CONFORMANCE_PAGES, REFERENCE, ParserChoice, available_parsers, probe
+
+PAGES = [b'<html><body><div id="entryContent"><h1>word%d</h1><p>definition</p></div></body></html>' % number
+         for number in range(CONFORMANCE_PAGES)]
+
+
+def headword(html, features):
+    return BeautifulSoup(html, features).h1.text
+
+
+def test_only_conforming_parsers_are_chosen():
+    decision = probe(PAGES, lambda html, features: features == REFERENCE)
+    assert decision['parser'] == REFERENCE
+    assert all(not result['conforms'] for features, result in decision['parsers'].items() if features != REFERENCE)
+
+    decision = probe(PAGES, headword, parsers=[REFERENCE])
+    assert decision['parser'] == REFERENCE and decision['parsers'][REFERENCE]['conforms']
+
+
+def timed_probe(monkeypatch, costs, warm_up_cost=0):
+    """ probe with a clock that advances by costs[features] seconds per page, more on the first page of each """
+    clock = [0.0]
+    parsed = set()
+
+    def extract(html, features):
+        clock[0] += costs[features] + (warm_up_cost if features not in parsed else 0)
+        parsed.add(features)
+        return html
+    monkeypatch.setattr(parsers.time, 'perf_counter', lambda: clock[0])
+    return probe(PAGES, extract, parsers=list(costs))
+
+
+def test_a_clearly_faster_parser_is_chosen_after_warming_up(monkeypatch):
+    # a slow first parse is left out of the timing
+    decision = timed_probe(monkeypatch, {REFERENCE: 3.0, 'lxml': 2.5}, warm_up_cost=100)
+    assert decision['parser'] == 'lxml' and decision['clear']
+    assert decision['parsers']['lxml']['ms_per_page'] == pytest.approx(2500)
+
+
+def test_a_small_margin_keeps_the_reference(monkeypatch):
+    decision = timed_probe(monkeypatch, {REFERENCE: 3.0, 'lxml': 2.9})
+    assert decision['parser'] == REFERENCE and decision['clear']
+    # no difference at all is not a result worth saving
+    decision = timed_probe(monkeypatch, {REFERENCE: 3.0, 'lxml': 3.0})
+    assert decision['parser'] == REFERENCE and not decision['clear']
+
+
+def test_unclear_decision_is_not_saved(tmp_path, monkeypatch):
+    monkeypatch.setattr(parsers, 'probe', lambda pages, extract: {'parser': 'lxml', 'clear': False, 'parsers': {}})
+    monkeypatch.setattr(ParserChoice, 'start_deciding', ParserChoice.decide)
+    choice = ParserChoice('auto', str(tmp_path), headword, 1, [].append)
+    for page in PAGES:
+        choice.page_downloaded(page)
+    assert choice.features == REFERENCE and choice.decided
+    assert not (tmp_path / 'parser.json').exists()
+
+
+@pytest.mark.skipif('lxml' not in available_parsers(), reason='lxml is not installed')
+def test_auto_choice_is_made_from_downloaded_pages_and_saved(tmp_path, monkeypatch):
+    reports = []
+    monkeypatch.setattr(parsers, 'probe', lambda pages, extract: {'parser': 'lxml', 'clear': True, 'parsers': {}})
+    # decide in the test thread
+    monkeypatch.setattr(ParserChoice, 'start_deciding', ParserChoice.decide)
+    choice = ParserChoice('auto', str(tmp_path), headword, 1, reports.append)
+    for page in PAGES:
+        assert choice.features == REFERENCE
+        choice.page_downloaded(page)
+    assert choice.features == 'lxml'
+    assert json.loads((tmp_path / 'parser.json').read_text())['pages'] == CONFORMANCE_PAGES
+
+    assert ParserChoice('auto', str(tmp_path), headword, 1, reports.append).features == 'lxml'
+    # a decision made for other extracted data is made again from the saved pages on the next download,
+    # a page that is already saved is not saved twice
+    choice = ParserChoice('auto', str(tmp_path), headword, 2, reports.append)
+    assert not choice.decided
+    choice.page_downloaded(PAGES[0])
+    assert json.loads((tmp_path / 'parser.json').read_text())['versions']['data'] == 2
+    assert len(choice.page_paths()) == CONFORMANCE_PAGES
+
+
+def test_concurrent_downloads_save_at_most_the_conformance_set(tmp_path, monkeypatch):
+    monkeypatch.setattr(ParserChoice, 'start_deciding', lambda self: None)
+    choice = ParserChoice('auto', str(tmp_path), headword, 1, [].append)
+    pages = [b'<h1>word%d</h1>' % number for number in range(4 * CONFORMANCE_PAGES)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(choice.page_downloaded, pages))
+    assert len(choice.page_paths()) == CONFORMANCE_PAGES
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in choice.page_paths())
+
+
+def test_pinned_choice_saves_nothing(tmp_path):
+    choice = ParserChoice('auto', str(tmp_path), headword, 1, [].append)
+    choice.pin()
+    for page in PAGES:
+        choice.page_downloaded(page)
+    assert choice.features == REFERENCE
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_setting_overrides_the_choice(tmp_path):
+    reports = []
+    assert ParserChoice('html.parser', str(tmp_path), headword, 1, reports.append).features == 'html.parser'
+    assert ParserChoice('html5lib-or-other', str(tmp_path), headword, 1, reports.append).features == REFERENCE
+    assert reports == ['parser html5lib-or-other is not available, html.parser is used']
+
+
+def test_failed_decision_keeps_the_reference_and_is_reported(tmp_path, monkeypatch):
+    def failing_probe(pages, extract):
+        raise ValueError('broken page')
+    monkeypatch.setattr(parsers, 'probe', failing_probe)
+    monkeypatch.setattr(ParserChoice, 'start_deciding', ParserChoice.decide)
+    reports = []
+    choice = ParserChoice('auto', str(tmp_path), headword, 1, reports.append)
+    for page in PAGES:
+        choice.page_downloaded(page)
+    assert choice.features == REFERENCE
+    assert choice.decided and not choice.deciding
+    assert reports == ['the parser could not be chosen, html.parser is used: ValueError: broken page']
+    # no more pages are collected in this session
+    choice.page_downloaded(PAGES[0])
+    assert len(choice.page_paths()) == CONFORMANCE_PAGES
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from AutoDefineAddon.cache import Prefetcher
+
+
+def test_prefetched_result_is_taken_once():
+    calls = []
+
+    def load(word):
+        calls.append(word)
+        return word.upper()
+
+    prefetcher = Prefetcher(load, ttl_seconds=60)
+    prefetcher.prefetch('apple')
+    prefetcher.prefetch('apple')
+    assert prefetcher.take('apple').result() == 'APPLE'
+    assert prefetcher.take('apple') is None
+    assert calls == ['apple']
+
+    prefetcher.prefetch('apple')
+    # defining another word drops the prefetch
+    assert prefetcher.take('pear') is None
+    assert prefetcher.take('apple') is None
+
+
+def test_changed_word_cancels_stale_prefetch():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load(word):
+        calls.append(word)
+        started.set()
+        release.wait(5)
+        return word
+
+    prefetcher = Prefetcher(load, ttl_seconds=60, max_workers=1)
+    prefetcher.prefetch('app')
+    started.wait(5)
+    prefetcher.prefetch('appl')
+    prefetcher.prefetch('apple')
+    release.set()
+    assert prefetcher.take('apple').result() == 'apple'
+    # 'app' was already running, 'appl' never started
+    assert calls == ['app', 'apple']
+
+
+def test_expired_and_failed_prefetches_are_not_used():
+    def load(word):
+        if word == 'broken':
+            raise ValueError(word)
+        return word
+
+    prefetcher = Prefetcher(load, ttl_seconds=0.05)
+    prefetcher.prefetch('apple')
+    time.sleep(0.1)
+    assert prefetcher.take('apple') is None
+
+    prefetcher.prefetch('broken')
+    prefetcher.future.exception(timeout=5)
+    assert prefetcher.take('broken') is None
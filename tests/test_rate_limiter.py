@@ -0,0 +1,109 @@
+import http.server
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from AutoDefineAddon.oxford import RateLimiter, RateLimited, Session, retry_after_seconds
+
+
+def test_retry_after_seconds():
+    now = time.time()
+    assert retry_after_seconds('120') == 120
+    assert retry_after_seconds(formatdate(now + 30, usegmt=True), now=now) == pytest.approx(30, abs=1)
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds('soon') is None
+
+
+def test_healthy_responses_raise_concurrency():
+    limiter = RateLimiter(rate=10000, max_concurrency=8)
+    for _ in range(200):
+        # a steady 100 ms latency, microsecond ones vary too much with scheduling
+        limiter.release(limiter.acquire() - 0.1, 200)
+    assert limiter.limit == 8
+
+
+def test_throttled_response_halves_concurrency_once_and_pauses():
+    limiter = RateLimiter(rate=10000, max_concurrency=8)
+    limiter.limit = 8.0
+    starts = [limiter.acquire() for _ in range(3)]
+    limiter.release(starts[0], 429, retry_after=0.2)
+    limiter.release(starts[1], 503)
+    limiter.release(starts[2])
+    assert limiter.limit == 4
+    assert limiter.paused_until > time.monotonic() + 0.1
+
+    start = time.monotonic()
+    limiter.release(limiter.acquire(), 200)
+    assert time.monotonic() - start >= 0.15
+
+
+def test_acquire_gives_up_instead_of_waiting_past_deadline():
+    limiter = RateLimiter(rate=10000, max_concurrency=8)
+    limiter.release(limiter.acquire(), 429, retry_after=60)
+    start = time.monotonic()
+    assert limiter.acquire(deadline=start + 1) is None
+    assert time.monotonic() - start < 0.5
+
+    limiter.paused_until = 0.0
+    assert limiter.acquire(deadline=time.monotonic() + 1) is not None
+
+
+class ThrottlingHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    throttled = 0
+    retry_after = '0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        throttle = type(self).throttled > 0
+        type(self).throttled -= 1
+        self.send_response(429 if throttle else 200)
+        self.send_header('Retry-After', type(self).retry_after)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Session.configure(retries=2)
+    yield 'http://127.0.0.1:%d/' % server.server_port
+    Session.configure(retries=3)
+    server.shutdown()
+
+
+def test_request_retries_throttled_answers(server):
+    ThrottlingHandler.throttled = 2
+    assert Session.request(server, headers={}).status_code == 200
+
+
+def test_request_gives_up_when_site_keeps_refusing(server):
+    ThrottlingHandler.throttled = 3
+    with pytest.raises(RateLimited):
+        Session.request(server, headers={})
+
+
+def test_request_fails_fast_when_waiting_is_limited(server, monkeypatch):
+    ThrottlingHandler.throttled = 1
+    monkeypatch.setattr(ThrottlingHandler, 'retry_after', '120')
+    start = time.monotonic()
+    with Session.waiting_at_most(3), pytest.raises(RateLimited):
+        Session.request(server, headers={})
+    assert time.monotonic() - start < 3
+    assert Session.max_wait() is None
+
+
+def test_wait_limit_belongs_to_the_thread_that_set_it():
+    limits = []
+    with Session.waiting_at_most(3):
+        thread = threading.Thread(target=lambda: limits.append(Session.max_wait()))
+        thread.start()
+        thread.join()
+        limits.append(Session.max_wait())
+    assert limits == [None, 3]
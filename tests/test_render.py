@@ -0,0 +1,26 @@
+from AutoDefineAddon.render import WORD_NOT_REPLACED, can_render, prettify, render
+
+BLOCKS = [
+    ('i', 'verb'),
+    ('div', ' to move   fast > walking '),
+    ('ul', ['I #ran# home.', WORD_NOT_REPLACED + 'She jogs & swims.', ' \n ']),
+    ('hr', None),
+    ('br', None),
+    ('div', ''),
+    ('i', '\xa0'),
+]
+
+
+def test_render_writes_what_prettify_does():
+    assert can_render(BLOCKS)
+    assert render(BLOCKS) == prettify(BLOCKS)
+    assert render(BLOCKS[:3]) == prettify(BLOCKS[:3])
+    assert render([('hr', None)]) == prettify([('hr', None)])
+    assert render([]) == prettify([]) == ''
+
+
+def test_markup_and_entities_are_left_to_the_parser():
+    assert not can_render([('ul', ['I <b>ran</b> home.'])])
+    assert not can_render([('div', 'fish &amp; chips')])
+    assert not can_render([('ul', [WORD_NOT_REPLACED + '&#233;'])])
+    assert can_render([('ul', [WORD_NOT_REPLACED + 'fish & chips'])])
@@ -0,0 +1,23 @@
+from AutoDefineAddon import pipeline
+
+
+def stems(*words):
+    return frozenset(tuple(pipeline.stem(token) for token in pipeline.tokinize(words)) for words in words)
+
+
+def test_replaces_every_form_and_keeps_spacing():
+    replaced, result = pipeline.replace_word_in_sentence(
+        stems('run', 'ran'), 'He ran,  then  Running\tstopped. They run!', True)
+    assert replaced
+    assert result == 'He #ran#,  then  #Running# stopped. They #run#!'
+
+
+def test_longest_sequence_wins():
+    _, result = pipeline.replace_word_in_sentence(stems('give', 'give up'), 'Never give up, give in.', False)
+    assert result == 'Never #give# #up#, #give# in.'
+
+
+def test_sequence_cut_by_end_of_sentence():
+    replaced, result = pipeline.replace_word_in_sentence(stems('give up'), 'I will not give', True)
+    assert not replaced
+    assert result == '<font color="red">Word_not_replaced</font> I will not give'
@@ -0,0 +1,23 @@
+import soupsieve
+from bs4 import BeautifulSoup
+from bs4.element import _cached_selector
+
+HTML = ('<div class="sense"><span class="def">to move fast</span>'
+        '<span class="x">run</span><span class="x">ran</span></div>')
+
+
+def test_compiled_and_cached_selectors_match_like_strings():
+    soup = BeautifulSoup(HTML, 'html.parser')
+    compiled = soupsieve.compile('.sense .x')
+    assert [tag.text for tag in soup.select(compiled)] == ['run', 'ran']
+    assert soup.select_one(compiled).text == 'run'
+    assert [tag.text for tag in soup.select('.sense .x', limit=1)] == ['run']
+
+    hits = _cached_selector.cache_info().hits
+    soup.select('.sense .x')
+    assert _cached_selector.cache_info().hits == hits + 1
+
+
+def test_custom_selectors_are_compiled_without_the_cache():
+    soup = BeautifulSoup(HTML, 'html.parser')
+    assert soup.select_one(':--example', custom={':--example': '.x'}).text == 'run'
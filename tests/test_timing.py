@@ -0,0 +1,41 @@
+import json
+
+from AutoDefineAddon.timing import NO_SPAN, Recorder
+
+
+def test_disabled_recorder_records_nothing():
+    recorder = Recorder()
+    assert recorder.span('parse') is NO_SPAN
+    with recorder.span('parse'):
+        pass
+    recorder.count('cache hits')
+    assert recorder.timed('render')(lambda value: value * 2)(21) == 42
+    assert recorder.summary() == {'spans': {}, 'counters': {}}
+
+
+def test_summary_and_dumps(tmp_path):
+    recorder = Recorder(enabled=True)
+    for duration in [0.001 * number for number in range(1, 101)]:
+        recorder.add('parse', recorder.origin, duration)
+    recorder.timed('render')(lambda: None)()
+    recorder.count('cache hits', 3)
+
+    summary = recorder.summary()
+    assert summary['spans']['parse']['count'] == 100
+    assert round(summary['spans']['parse']['p50_ms']) == 50
+    assert round(summary['spans']['parse']['p95_ms']) == 95
+    assert round(summary['spans']['parse']['max_ms']) == 100
+    assert summary['spans']['render']['count'] == 1
+    assert summary['counters'] == {'cache hits': 3}
+    assert recorder.report().splitlines()[1].startswith('parse')
+
+    recorder.dump_json(str(tmp_path / 'timing.json'))
+    assert json.loads((tmp_path / 'timing.json').read_text()) == summary
+
+    recorder.dump_chrome_trace(str(tmp_path / 'trace.json'))
+    events = json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
+    assert sum(1 for event in events if event['name'] == 'parse' and event['ph'] == 'X') == 100
+    assert events[-1]['ph'] == 'C' and events[-1]['args'] == {'cache hits': 3}
+
+    recorder.reset()
+    assert recorder.summary() == {'spans': {}, 'counters': {}}
@@ -0,0 +1,30 @@
+import pickle
+
+from bs4 import BeautifulSoup
+
+HTML = '<div class="sense"><span class="def">to move fast</span><span class="x">run</span></div>'
+
+
+def test_tags_keep_their_links_in_slots():
+    soup = BeautifulSoup(HTML, 'html.parser')
+    first, second = soup.find_all('span')
+    assert first.next_sibling is second and second.previous_sibling is first
+    assert first.parent is soup.div and first.next_element == 'to move fast'
+    assert all(not vars(tag) for tag in soup.find_all(True))
+
+    names = BeautifulSoup(HTML, 'html.parser').find_all('span')
+    assert names[0].name is first.name
+    assert next(iter(names[0].attrs)) is next(iter(first.attrs))
+    assert names[0]['class'][0] is first['class'][0]
+
+
+def test_decompose_and_pickle():
+    soup = BeautifulSoup(HTML, 'html.parser')
+    copy = pickle.loads(pickle.dumps(soup))
+    assert copy.decode() == soup.decode()
+    assert copy.select_one('.x').text == 'run'
+
+    tag = soup.select_one('.def')
+    tag.decompose()
+    assert tag.decomposed and tag.contents == []
+    assert soup.decode() == '<div class="sense"><span class="x">run</span></div>'